@@ -10,6 +10,7 @@ class Settings(BaseSettings):
     MODEL_MAX_TOKENS: int = 256
     MODEL_TEMPERATURE: float = 0.7
     DB_PATH: str = "/data/conversations.db"
+    HEALTH_CHECK_INTERVAL_S: float = 10.0
     LOG_LEVEL: str = "INFO"
     CONTAINER_MEMORY_LIMIT_MB: int = 2500
 
@@ -1,25 +1,100 @@
 import logging
 import os
+import queue
 import sqlite3
+import threading
 import time
 
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# WAL supports one writer plus many concurrent readers, so we keep a single
+# long-lived writer connection and a small pool of read-only connections
+# instead of opening (and re-PRAGMA-ing) a fresh connection per request.
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA temp_store=memory",
+    "PRAGMA wal_autocheckpoint=1000",
+)
 
-def _get_connection() -> sqlite3.Connection:
-    os.makedirs(os.path.dirname(settings.DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(settings.DB_PATH, check_same_thread=False)
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA busy_timeout=5000")
-    conn.row_factory = sqlite3.Row
-    return conn
+# Module-level constant so sqlite3's LRU statement cache reuses the same
+# prepared statement across calls instead of re-parsing the SQL.
+_INSERT_SQL = (
+    "INSERT INTO conversations (user_id, message, response, tokens_generated, inference_ms, timestamp)"
+    " VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+_HISTORY_COLUMNS = (
+    "id", "user_id", "message", "response",
+    "tokens_generated", "inference_ms", "timestamp",
+)
+_HISTORY_SQL = (
+    f"SELECT {', '.join(_HISTORY_COLUMNS)} FROM conversations"
+    " WHERE user_id = ? ORDER BY timestamp DESC LIMIT ?"
+)
+
+# Newest N rows, returned oldest-first so callers can build prompts
+# without reversing in Python.
+_HISTORY_ASC_SQL = (
+    f"SELECT {', '.join(_HISTORY_COLUMNS)} FROM ({_HISTORY_SQL})"
+    " ORDER BY timestamp ASC"
+)
+
+_writer_conn: sqlite3.Connection | None = None
+_writer_lock = threading.Lock()
+_reader_pool: queue.Queue | None = None
+_pool_lock = threading.Lock()
+
+# Conversation rows are queued and flushed in batches by a background
+# thread, so one fsync is amortized across many /chat requests instead
+# of one commit (and WAL fsync) per request.
+_write_queue: queue.Queue = queue.Queue()
+_writer_thread: threading.Thread | None = None
+_BATCH_MAX_ROWS = 64
+_BATCH_MAX_WAIT_S = 0.05
+
+
+def _apply_pragmas(conn: sqlite3.Connection) -> None:
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+
+
+def _get_writer() -> sqlite3.Connection:
+    global _writer_conn
+    if _writer_conn is None:
+        os.makedirs(os.path.dirname(settings.DB_PATH), exist_ok=True)
+        conn = sqlite3.connect(settings.DB_PATH, check_same_thread=False)
+        _apply_pragmas(conn)
+        conn.row_factory = sqlite3.Row
+        _writer_conn = conn
+    return _writer_conn
+
+
+def _get_reader_pool() -> queue.Queue:
+    global _reader_pool
+    if _reader_pool is None:
+        with _pool_lock:
+            if _reader_pool is None:
+                pool: queue.Queue = queue.Queue()
+                for _ in range(os.cpu_count() or 2):
+                    conn = sqlite3.connect(
+                        f"file:{settings.DB_PATH}?mode=ro",
+                        uri=True,
+                        check_same_thread=False,
+                    )
+                    _apply_pragmas(conn)
+                    pool.put(conn)
+                _reader_pool = pool
+    return _reader_pool
 
 
 def init_db() -> None:
-    conn = _get_connection()
-    try:
+    with _writer_lock:
+        conn = _get_writer()
         conn.execute("""
             CREATE TABLE IF NOT EXISTS conversations (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -28,13 +103,81 @@ def init_db() -> None:
                 response TEXT,
                 tokens_generated INTEGER,
                 inference_ms REAL,
-                timestamp REAL
+                timestamp INTEGER
             )
         """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_conv_user_ts
+            ON conversations(user_id, timestamp DESC)
+        """)
         conn.commit()
-        logger.info("Database initialized")
-    finally:
-        conn.close()
+    _start_writer_thread()
+    logger.info("Database initialized")
+
+
+def _drain_batch() -> list[tuple]:
+    """Collect up to _BATCH_MAX_ROWS queued rows, waiting briefly for more."""
+    batch = [_write_queue.get()]
+    deadline = time.monotonic() + _BATCH_MAX_WAIT_S
+    while len(batch) < _BATCH_MAX_ROWS:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_write_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+
+def _rollback_writer() -> None:
+    """Roll back any half-open transaction on the writer connection."""
+    with _writer_lock:
+        try:
+            _get_writer().rollback()
+        except sqlite3.Error:
+            pass
+
+
+def _writer_loop() -> None:
+    while True:
+        batch = []
+        try:
+            batch = _drain_batch()
+            for attempt in range(5):
+                try:
+                    with _writer_lock:
+                        conn = _get_writer()
+                        conn.execute("BEGIN IMMEDIATE")
+                        conn.executemany(_INSERT_SQL, batch)
+                        conn.commit()
+                    break
+                except sqlite3.OperationalError:
+                    # Database busy; roll back so the retry can BEGIN
+                    # again, then back off and retry the whole batch
+                    _rollback_writer()
+                    time.sleep(0.05 * (2 ** attempt))
+            else:
+                logger.error(
+                    "Dropped batch of %d conversation rows after retries", len(batch)
+                )
+        except Exception:
+            # The writer is the only thread draining the queue — it must
+            # never die, or save_conversation would enqueue forever with
+            # nothing persisting.
+            _rollback_writer()
+            logger.exception(
+                "Writer error; dropped batch of %d conversation rows", len(batch)
+            )
+
+
+def _start_writer_thread() -> None:
+    global _writer_thread
+    if _writer_thread is None or not _writer_thread.is_alive():
+        _writer_thread = threading.Thread(
+            target=_writer_loop, name="db-writer", daemon=True
+        )
+        _writer_thread.start()
 
 
 def save_conversation(
@@ -43,27 +186,29 @@ def save_conversation(
     response: str,
     tokens_generated: int,
     inference_ms: float,
-) -> int:
-    conn = _get_connection()
+) -> None:
+    # Nanosecond integer timestamps: cheaper to produce than a float and
+    # sort on SQLite's 64-bit integer path (divide by 1e9 for seconds).
+    _write_queue.put(
+        (user_id, message, response, tokens_generated, inference_ms, time.time_ns())
+    )
+
+
+def get_conversation_history(user_id: str, limit: int = 10) -> list[dict]:
+    pool = _get_reader_pool()
+    conn = pool.get()
     try:
-        cursor = conn.execute(
-            """INSERT INTO conversations (user_id, message, response, tokens_generated, inference_ms, timestamp)
-               VALUES (?, ?, ?, ?, ?, ?)""",
-            (user_id, message, response, tokens_generated, inference_ms, time.time()),
-        )
-        conn.commit()
-        return cursor.lastrowid
+        rows = conn.execute(_HISTORY_SQL, (user_id, limit)).fetchall()
+        return [dict(zip(_HISTORY_COLUMNS, row)) for row in rows]
     finally:
-        conn.close()
+        pool.put(conn)
 
 
-def get_conversation_history(user_id: str, limit: int = 10) -> list[dict]:
-    conn = _get_connection()
+def get_conversation_history_asc(user_id: str, limit: int = 10) -> list[dict]:
+    pool = _get_reader_pool()
+    conn = pool.get()
     try:
-        rows = conn.execute(
-            "SELECT * FROM conversations WHERE user_id = ? ORDER BY timestamp DESC LIMIT ?",
-            (user_id, limit),
-        ).fetchall()
-        return [dict(row) for row in rows]
+        rows = conn.execute(_HISTORY_ASC_SQL, (user_id, limit)).fetchall()
+        return [dict(zip(_HISTORY_COLUMNS, row)) for row in rows]
     finally:
-        conn.close()
+        pool.put(conn)
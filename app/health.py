@@ -27,7 +27,7 @@ async def liveness():
 
 @router.get("/ready")
 async def readiness():
-    health = model_manager.health_check()
+    health = model_manager.cached_health()
     memory = model_manager.get_memory_usage()
 
     if (
@@ -55,12 +55,12 @@ async def readiness():
 
 @router.get("/health/deep")
 async def deep_health():
-    health = model_manager.health_check()
+    health = model_manager.cached_health()
     memory = model_manager.get_memory_usage()
     uptime = time.time() - _start_time
     avg_latency = (_total_latency_ms / _requests_served) if _requests_served > 0 else 0
 
-    from app.metrics import active_requests as ar_gauge
+    from app.metrics import get_inflight
 
     return {
         "status": "ok" if health.get("inference_working") else "degraded",
@@ -73,7 +73,9 @@ async def deep_health():
         "uptime_seconds": round(uptime, 1),
         "requests_served": _requests_served,
         "avg_latency_ms": round(avg_latency, 1),
-        "active_requests": ar_gauge._value.get(),
+        # This request is itself in flight — exclude it, so a drain
+        # poller sees 0 on an otherwise idle server.
+        "active_requests": max(get_inflight() - 1, 0),
         "version": "1.0.0",
         "container_id": os.environ.get("HOSTNAME", "unknown"),
         "color": os.environ.get("DEPLOYMENT_COLOR", "unknown"),
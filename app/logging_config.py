@@ -1,28 +1,36 @@
-import json
 import logging
 import sys
 from datetime import datetime, timezone
 
+import orjson
+
 from app.config import settings
 
+_EXTRA_KEYS = frozenset((
+    "request_id", "user_id", "latency_ms", "tokens_generated",
+    "model_version", "memory_mb",
+))
+
 
 class JSONFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         log_entry = {
-            "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z",
+            # orjson serializes the datetime natively (OPT_UTC_Z renders
+            # the offset as "Z"), far faster than strftime + slicing.
+            "timestamp": datetime.now(timezone.utc),
             "level": record.levelname,
             "event": record.getMessage(),
             "module": record.module,
         }
-        for key in (
-            "request_id", "user_id", "latency_ms", "tokens_generated",
-            "model_version", "memory_mb",
-        ):
-            value = getattr(record, key, None)
-            if value is not None:
-                log_entry[key] = value
-
-        return json.dumps(log_entry)
+        # Intersect the record's attribute dict with the known extras in
+        # a single comprehension instead of probing each key via getattr.
+        log_entry.update(
+            (k, v)
+            for k, v in record.__dict__.items()
+            if k in _EXTRA_KEYS and v is not None
+        )
+
+        return orjson.dumps(log_entry, option=orjson.OPT_UTC_Z).decode()
 
 
 def setup_logging() -> None:
@@ -1,13 +1,15 @@
+import asyncio
+import itertools
 import logging
-import uuid
+import secrets
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 from app.config import settings
-from app.database import get_conversation_history, init_db, save_conversation
+from app.database import get_conversation_history_asc, init_db, save_conversation
 from app.health import record_request, router as health_router
 from app.logging_config import setup_logging
 from app.metrics import MetricsMiddleware, metrics_response, set_model_loaded, set_deployment_info
@@ -15,6 +17,26 @@ from app.model_manager import model_manager
 
 logger = logging.getLogger(__name__)
 
+# uuid4() reads /dev/urandom per call; a per-process random tag plus an
+# atomic counter is unique enough for request tracing and ~10x cheaper.
+_PROCESS_TAG = secrets.token_hex(4)
+_REQ_COUNTER = itertools.count(1)
+
+
+def _new_request_id() -> str:
+    return f"{_PROCESS_TAG}-{next(_REQ_COUNTER):x}"
+
+
+async def _health_refresh_loop() -> None:
+    """Keep the model health cache warm so /ready never pays for the
+    synthetic inference itself."""
+    while True:
+        try:
+            await model_manager.refresh_health_async()
+        except Exception:
+            logger.exception("Background health refresh failed")
+        await asyncio.sleep(settings.HEALTH_CHECK_INTERVAL_S)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -22,12 +44,19 @@ async def lifespan(app: FastAPI):
     logger.info("Starting server")
     model_manager.load_model()
     init_db()
+    health_task = asyncio.create_task(_health_refresh_loop())
     logger.info(f"Server ready on port {settings.PORT}")
     yield
+    health_task.cancel()
     logger.info("Server shutting down gracefully")
 
 
-app = FastAPI(title="SmolLM2 Zero-Downtime Server", version="1.0.0", lifespan=lifespan)
+app = FastAPI(
+    title="SmolLM2 Zero-Downtime Server",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 app.add_middleware(MetricsMiddleware)
 app.include_router(health_router)
 
@@ -48,13 +77,13 @@ class ChatWithContextRequest(BaseModel):
 
 @app.post("/chat")
 async def chat(req: ChatRequest):
-    request_id = str(uuid.uuid4())
+    request_id = _new_request_id()
     logger.info("Chat request received", extra={"request_id": request_id, "user_id": req.user_id})
 
     try:
-        result = model_manager.generate(req.message, req.max_tokens, req.temperature)
+        result = await model_manager.generate_async(req.message, req.max_tokens, req.temperature)
     except RuntimeError as e:
-        return JSONResponse(status_code=503, content={"error": str(e), "request_id": request_id})
+        return ORJSONResponse(status_code=503, content={"error": str(e), "request_id": request_id})
 
     save_conversation(req.user_id, req.message, result["text"], result["tokens_generated"], result["inference_ms"])
     record_request(result["inference_ms"])
@@ -75,24 +104,25 @@ async def chat(req: ChatRequest):
 
 @app.post("/chat/{user_id}")
 async def chat_with_user(user_id: str, req: ChatWithContextRequest):
-    request_id = str(uuid.uuid4())
+    request_id = _new_request_id()
     logger.info("Chat request received", extra={"request_id": request_id, "user_id": user_id})
 
     prompt = req.message
     if req.context:
-        history = get_conversation_history(user_id, limit=5)
+        history = get_conversation_history_asc(user_id, limit=5)
         if history:
-            context_lines = []
-            for h in reversed(history):
-                context_lines.append(f"User: {h['message']}")
-                context_lines.append(f"Assistant: {h['response']}")
-            context_lines.append(f"User: {req.message}")
-            prompt = "\n".join(context_lines)
+            lines = [
+                f"{role}: {text}"
+                for h in history
+                for role, text in (("User", h["message"]), ("Assistant", h["response"]))
+            ]
+            lines.append(f"User: {req.message}")
+            prompt = "\n".join(lines)
 
     try:
-        result = model_manager.generate(prompt, req.max_tokens, req.temperature)
+        result = await model_manager.generate_async(prompt, req.max_tokens, req.temperature)
     except RuntimeError as e:
-        return JSONResponse(status_code=503, content={"error": str(e), "request_id": request_id})
+        return ORJSONResponse(status_code=503, content={"error": str(e), "request_id": request_id})
 
     save_conversation(user_id, req.message, result["text"], result["tokens_generated"], result["inference_ms"])
     record_request(result["inference_ms"])
@@ -1,10 +1,10 @@
+import functools
 import os
+import threading
 import time
 
 import psutil
 from prometheus_client import Counter, Gauge, Histogram, Info, generate_latest, CONTENT_TYPE_LATEST
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
 from starlette.responses import Response
 
 # ── Metric definitions ──
@@ -31,6 +31,17 @@ model_inference_duration_seconds = Histogram(
 
 active_requests = Gauge("active_requests", "Number of in-flight requests")
 
+# Plain in-flight counter mirroring the gauge, so deep_health can read
+# it without reaching into prometheus_client's private MutexValue.
+_inflight_lock = threading.Lock()
+_inflight = 0
+
+
+def get_inflight() -> int:
+    """Current number of in-flight HTTP requests."""
+    with _inflight_lock:
+        return _inflight
+
 model_loaded = Gauge(
     "model_loaded",
     "Whether the model is loaded (1=loaded, 0=not loaded)",
@@ -50,14 +61,43 @@ deployment_color = Info("deployment", "Current deployment color and version")
 
 # ── Path normalization ──
 
+@functools.lru_cache(maxsize=1024)
 def normalize_path(path: str) -> str:
     """Normalize dynamic path segments to prevent metric label explosion."""
-    parts = path.strip("/").split("/")
-    if len(parts) >= 2 and parts[0] == "chat":
+    # /chat/{user_id} is the only parameterized route; a startswith check
+    # avoids the strip/split list allocation per request.
+    if path.startswith("/chat/") and path != "/chat":
         return "/chat/{user_id}"
     return path
 
 
+# prometheus_client's .labels() hashes the label values and takes a lock
+# on every call; cache the bound children per label tuple instead.
+_req_counter_cache: dict = {}
+_dur_hist_cache: dict = {}
+
+
+def _counter_child(method: str, path: str, status_code: int):
+    key = (method, path, status_code)
+    child = _req_counter_cache.get(key)
+    if child is None:
+        child = _req_counter_cache.setdefault(
+            key,
+            http_requests_total.labels(method=method, path=path, status_code=status_code),
+        )
+    return child
+
+
+def _histogram_child(method: str, path: str):
+    key = (method, path)
+    child = _dur_hist_cache.get(key)
+    if child is None:
+        child = _dur_hist_cache.setdefault(
+            key, http_request_duration_seconds.labels(method=method, path=path)
+        )
+    return child
+
+
 # ── Helper functions ──
 
 def record_inference(model_name: str, duration_seconds: float, num_tokens: int):
@@ -66,10 +106,26 @@ def record_inference(model_name: str, duration_seconds: float, num_tokens: int):
     tokens_generated_total.labels(model_name=model_name).inc(num_tokens)
 
 
+# psutil.Process() re-parses /proc on every instantiation; keep one
+# instance and cache memory_info reads for a second, since readiness
+# and deep-health probes both hit this.
+_PROC = psutil.Process()
+_mem_cache = {"ts": 0.0, "rss": 0, "vms": 0}
+
+
+def get_process_memory() -> tuple[int, int]:
+    """Return (rss, vms) bytes for this process, cached for ~1s."""
+    now = time.monotonic()
+    if now - _mem_cache["ts"] > 1.0:
+        mem = _PROC.memory_info()
+        _mem_cache.update(ts=now, rss=mem.rss, vms=mem.vms)
+    return _mem_cache["rss"], _mem_cache["vms"]
+
+
 def update_memory_metric():
     """Update the memory usage gauge."""
-    process = psutil.Process()
-    memory_usage_bytes.set(process.memory_info().rss)
+    rss, _ = get_process_memory()
+    memory_usage_bytes.set(rss)
 
 
 def set_model_loaded(model_name: str, loaded: bool):
@@ -93,37 +149,48 @@ def metrics_response() -> Response:
 
 # ── Middleware ──
 
-class MetricsMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next) -> Response:
-        if request.url.path == "/metrics":
-            return await call_next(request)
+# High-rate probe endpoints skip instrumentation entirely: /healthz is
+# hit every second by liveness probes and /metrics by the scraper.
+_UNINSTRUMENTED = frozenset({"/metrics", "/healthz", "/ready"})
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware — avoids BaseHTTPMiddleware's per-request
+    task group and stream wrapping, which adds measurable overhead to
+    every request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] in _UNINSTRUMENTED:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        path = scope["path"]
+        status_code = 500
 
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        global _inflight
         active_requests.inc()
+        with _inflight_lock:
+            _inflight += 1
         start = time.perf_counter()
-
         try:
-            response = await call_next(request)
-            duration = time.perf_counter() - start
-            normalized = normalize_path(request.url.path)
-
-            http_requests_total.labels(
-                method=request.method,
-                path=normalized,
-                status_code=response.status_code,
-            ).inc()
-
-            http_request_duration_seconds.labels(
-                method=request.method,
-                path=normalized,
-            ).observe(duration)
-
-            return response
-        except Exception:
-            http_requests_total.labels(
-                method=request.method,
-                path=request.url.path,
-                status_code=500,
-            ).inc()
-            raise
+            await self.app(scope, receive, send_wrapper)
         finally:
+            duration = time.perf_counter() - start
+            normalized = normalize_path(path)
+
+            _counter_child(method, normalized, status_code).inc()
+            _histogram_child(method, normalized).observe(duration)
+
             active_requests.dec()
+            with _inflight_lock:
+                _inflight -= 1
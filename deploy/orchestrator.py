@@ -13,25 +13,67 @@ Usage:
 """
 
 import argparse
+import contextlib
+import hashlib
+import http.client
+import io
 import json
 import logging
+import os
+import queue
+import shlex
 import shutil
+import socket
 import subprocess
 import sys
+import tempfile
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime, timezone
 from pathlib import Path
 
+try:
+    # Optional: the docker SDK keeps one Unix-socket connection open for
+    # the whole run instead of paying CLI startup (~100ms) per query.
+    import docker as docker_sdk
+except ImportError:
+    docker_sdk = None
+
+
+# docker/compose verbs that change container state; run_command drops the
+# docker query cache whenever one appears in the argv.
+_MUTATING_DOCKER_VERBS = frozenset({"up", "start", "stop", "rm", "restart", "kill"})
+
 
 class DeploymentError(Exception):
     """Raised when a deployment step fails."""
     pass
 
 
+class JsonFormatter(logging.Formatter):
+    """Emit one JSON object per record via json.dumps.
+
+    The previous %-template produced invalid JSON whenever a message
+    contained a quote or backslash (e.g. docker stderr snippets)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps({
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "msg": record.getMessage(),
+        })
+
+
 class DeploymentOrchestrator:
     def __init__(self, project_root: str, health_timeout: int = 180, drain_seconds: int = 15):
         self.project_root = Path(project_root).resolve()
         self.state_file = self.project_root / "deploy" / "state.json"
+        self.history_file = self.project_root / "deploy" / "history.jsonl"
+        self.verified_hash_file = (
+            self.project_root / "deploy" / ".nginx-verified-sha256.json"
+        )
         self.nginx_conf_dir = self.project_root / "nginx" / "conf.d"
         self.nginx_templates_dir = self.project_root / "nginx"
         self.compose_file = self.project_root / "docker-compose.yml"
@@ -39,8 +81,92 @@ class DeploymentOrchestrator:
         self.health_timeout = health_timeout
         self.drain_seconds = drain_seconds
 
+        # Keep-alive HTTP connections per port, reused across health polls
+        # instead of forking a curl process for every probe.
+        self._health_conns: dict = {}
+
+        # Short-TTL cache for docker inspect/ps round-trips; a deploy asks
+        # the same questions about the same containers within seconds.
+        self._docker_cache: dict = {}
+
+        # Minimal env for child processes: docker only needs these three,
+        # and a small env keeps subprocess on the posix_spawn fast path.
+        self._child_env = {
+            "PATH": os.environ.get("PATH", ""),
+            "HOME": os.environ.get("HOME", ""),
+        }
+        if os.environ.get("DOCKER_HOST"):
+            self._child_env["DOCKER_HOST"] = os.environ["DOCKER_HOST"]
+
+        # Upstream templates cached once at init: avoids re-reading them
+        # on every swap and closes the window where editing a template
+        # mid-deploy would make rollback state inconsistent.
+        self._upstream_templates: dict = {}
+        self._upstream_mtimes: dict = {}
+        for color in ("blue", "green"):
+            template = self.nginx_templates_dir / f"upstream-{color}.conf"
+            if template.exists():
+                self._upstream_templates[color] = template.read_text()
+                self._upstream_mtimes[color] = template.stat().st_mtime_ns
+
+        # SHA256 digests of configs that have already passed nginx -t;
+        # reloads with a known-good config skip the explicit test pass.
+        self._verified_hashes: set = set()
+        try:
+            self._verified_hashes = set(
+                json.loads(self.verified_hash_file.read_text())
+            )
+        except (OSError, json.JSONDecodeError):
+            pass
+
+        # Persistent docker daemon client when the SDK is installed;
+        # helpers fall back to the CLI when it is not.
+        self.dc = None
+        if docker_sdk is not None:
+            try:
+                self.dc = docker_sdk.from_env()
+            except Exception:
+                self.dc = None
+
         self.logger = self._setup_logger()
 
+    def _validate_templates_host(self) -> None:
+        """Syntax-check the cached upstream templates with host nginx.
+
+        Called at the start of deploy/prewarm flows — not in __init__,
+        so a broken template can't block status, history, or an
+        emergency rollback to a still-good config.
+
+        Docker service names (smollm2-blue/green) don't resolve on the
+        host, so 'host not found' failures are expected and ignored;
+        only genuine parse errors raise."""
+        nginx_bin = shutil.which("nginx")
+        if nginx_bin is None:
+            return
+        for color, text in self._upstream_templates.items():
+            tmp = tempfile.NamedTemporaryFile(
+                "w", suffix=".conf", delete=False
+            )
+            try:
+                tmp.write("events {}\nhttp {\n" + text + "\n}\n")
+                tmp.close()
+                result = subprocess.run(
+                    [nginx_bin, "-t", "-c", tmp.name],
+                    capture_output=True,
+                    text=True,
+                    timeout=5,
+                )
+                if result.returncode != 0 and "host not found" not in result.stderr:
+                    raise DeploymentError(
+                        f"upstream-{color}.conf failed nginx -t: "
+                        f"{result.stderr.strip()}"
+                    )
+                self.log(f"  upstream-{color}.conf validated (host nginx)", level="DEBUG")
+            except (OSError, subprocess.TimeoutExpired):
+                return
+            finally:
+                os.unlink(tmp.name)
+
     def _setup_logger(self) -> logging.Logger:
         logger = logging.getLogger("orchestrator")
         logger.setLevel(logging.DEBUG)
@@ -57,21 +183,45 @@ class DeploymentOrchestrator:
         self.log_file.parent.mkdir(parents=True, exist_ok=True)
         file_handler = logging.FileHandler(self.log_file)
         file_handler.setLevel(logging.DEBUG)
-        file_fmt = logging.Formatter(
-            '{"time": "%(asctime)s", "level": "%(levelname)s", "msg": "%(message)s"}',
-            datefmt="%Y-%m-%dT%H:%M:%S",
-        )
+        file_fmt = JsonFormatter(datefmt="%Y-%m-%dT%H:%M:%S")
         file_handler.setFormatter(file_fmt)
 
+        self._log_listener = None
         if not logger.handlers:
-            logger.addHandler(stdout_handler)
-            logger.addHandler(file_handler)
+            # Route records through a queue so deploy threads never block
+            # on disk flushes — sub-second jitter matters inside the
+            # nginx swap window.
+            log_queue = queue.SimpleQueue()
+            logger.addHandler(QueueHandler(log_queue))
+            self._log_listener = QueueListener(
+                log_queue, stdout_handler, file_handler,
+                respect_handler_level=True,
+            )
+            self._log_listener.start()
 
         return logger
 
+    def close(self) -> None:
+        """Flush and stop the background log listener."""
+        if getattr(self, "_log_listener", None) is not None:
+            self._log_listener.stop()
+            self._log_listener = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
     def log(self, msg: str, level: str = "INFO"):
         getattr(self.logger, level.lower(), self.logger.info)(msg)
 
+    @staticmethod
+    def _now_iso() -> str:
+        """Current UTC time as an ISO string; call once per step and
+        reuse so state and history timestamps agree."""
+        return datetime.now(timezone.utc).isoformat()
+
     # ── State Management ──────────────────────────────────────────
 
     def read_state(self) -> dict:
@@ -84,20 +234,49 @@ class DeploymentOrchestrator:
                 "last_deployment": None,
                 "last_model_version": "smollm2-1.7b-q4",
                 "deployment_count": 0,
-                "history": [],
             }
             self.save_state(default_state)
             return default_state
         with open(self.state_file) as f:
-            return json.load(f)
+            state = json.load(f)
+        # One-time migration: older state files embedded history; move
+        # those entries to the append-only log so every later save writes
+        # only the small current-state payload.
+        legacy = state.pop("history", None)
+        if legacy:
+            if not self.history_file.exists():
+                for entry in legacy:
+                    self._append_history(entry)
+            self.save_state(state)
+        return state
 
     def save_state(self, state: dict) -> None:
-        if self.state_file.exists():
-            shutil.copy2(self.state_file, str(self.state_file) + ".bak")
+        # Write-temp-then-rename is atomic on POSIX: a crash mid-save can
+        # never leave state.json half-written. History lives in its own
+        # append-only log, so the payload stays under 1KB.
         self.state_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.state_file, "w") as f:
-            json.dump(state, f, indent=4)
+        tmp_file = self.state_file.with_suffix(".json.tmp")
+        payload = {k: v for k, v in state.items() if k != "history"}
+        with open(tmp_file, "w") as f:
+            # Compact separators: nobody hand-edits state.json, and the
+            # pretty-printer costs pure-Python formatting per save
+            json.dump(payload, f, separators=(",", ":"))
             f.write("\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.state_file)
+
+    def _append_history(self, entry: dict) -> None:
+        """Record one deployment transition in deploy/history.jsonl.
+
+        Appending a single line is both cheaper than rewriting the state
+        snapshot with its embedded history and keeps the full audit trail
+        instead of the last 20 entries."""
+        self.history_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.history_file, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
 
     # ── Command Execution ─────────────────────────────────────────
 
@@ -105,7 +284,8 @@ class DeploymentOrchestrator:
         self, cmd, timeout: int = 30, check: bool = True
     ) -> subprocess.CompletedProcess:
         if isinstance(cmd, str):
-            cmd_list = cmd.split()
+            # shlex.split keeps quoted arguments intact, unlike str.split
+            cmd_list = shlex.split(cmd)
             cmd_str = cmd
         else:
             cmd_list = list(cmd)
@@ -119,7 +299,13 @@ class DeploymentOrchestrator:
                 text=True,
                 timeout=timeout,
                 cwd=str(self.project_root),
+                env=self._child_env,
             )
+            # Centralized cache invalidation: any container-mutating verb
+            # invalidates the docker query cache, so no call site can
+            # forget and serve a stale running/id answer.
+            if not _MUTATING_DOCKER_VERBS.isdisjoint(cmd_list):
+                self._invalidate_docker_cache()
             if check and result.returncode != 0:
                 self.log(
                     f"  Command failed (rc={result.returncode}): {result.stderr.strip()}",
@@ -134,6 +320,45 @@ class DeploymentOrchestrator:
 
     # ── Health Checking ───────────────────────────────────────────
 
+    def _http_request(
+        self,
+        port: int,
+        path: str,
+        method: str = "GET",
+        body: str | None = None,
+        headers: dict | None = None,
+        timeout: int = 25,
+    ) -> tuple:
+        """Issue an HTTP request to localhost:port, reusing a kept-alive
+        connection per port. Returns (status, body_bytes); raises on
+        connection failure after one reconnect attempt."""
+        conn = self._health_conns.get(port)
+        for attempt in (0, 1):
+            if conn is None:
+                conn = http.client.HTTPConnection("localhost", port, timeout=timeout)
+                self._health_conns[port] = conn
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                resp = conn.getresponse()
+                return resp.status, resp.read()
+            except Exception:
+                conn.close()
+                self._health_conns.pop(port, None)
+                conn = None
+                if attempt:
+                    raise
+        raise ConnectionError(f"unreachable: localhost:{port}")
+
+    @staticmethod
+    def _tcp_up(port: int, timeout: float = 0.2) -> bool:
+        """Cheap TCP-connect probe — avoids a full HTTP request while the
+        container socket isn't even listening yet."""
+        try:
+            with socket.create_connection(("localhost", port), timeout=timeout):
+                return True
+        except OSError:
+            return False
+
     def check_container_health(
         self,
         port: int,
@@ -141,22 +366,25 @@ class DeploymentOrchestrator:
         timeout: int = 120,
         poll_interval: int = 2,
     ) -> bool:
-        url = f"http://localhost:{port}{endpoint}"
         start = time.time()
         attempts = 0
+        # Exponential backoff: catch fast readiness within ~100ms instead
+        # of a full poll_interval, while slow warm-ups converge to the
+        # configured interval.
+        delay = 0.1
 
         while time.time() - start < timeout:
             attempts += 1
+            if not self._tcp_up(port):
+                self.log(f"  Poll {attempts}: port {port} not accepting yet")
+                time.sleep(delay)
+                delay = min(delay * 1.5, poll_interval)
+                continue
             try:
-                result = subprocess.run(
-                    ["curl", "-sf", "--max-time", "25", url],
-                    capture_output=True,
-                    text=True,
-                    timeout=30,
-                )
-                if result.returncode == 0:
+                status, data = self._http_request(port, endpoint, timeout=25)
+                if status == 200:
                     try:
-                        body = json.loads(result.stdout)
+                        body = json.loads(data)
                         if body.get("status") == "ready":
                             self.log(
                                 f"  Health OK after {attempts} attempts "
@@ -169,15 +397,14 @@ class DeploymentOrchestrator:
                     except json.JSONDecodeError:
                         self.log(f"  Poll {attempts}: non-JSON response")
                 else:
-                    self.log(
-                        f"  Poll {attempts}: HTTP error (curl rc={result.returncode})"
-                    )
-            except (subprocess.TimeoutExpired, Exception) as e:
+                    self.log(f"  Poll {attempts}: HTTP {status}")
+            except Exception as e:
                 self.log(
                     f"  Poll {attempts}: connection failed ({type(e).__name__})"
                 )
 
-            time.sleep(poll_interval)
+            time.sleep(delay)
+            delay = min(delay * 1.5, poll_interval)
 
         self.log(
             f"  Health check timed out after {timeout}s ({attempts} attempts)"
@@ -188,67 +415,193 @@ class DeploymentOrchestrator:
         """Quick health check - just one attempt with timeout.
         Used to verify a pre-warmed container is still alive."""
         try:
-            result = self.run_command(
-                f"curl -sf --max-time {timeout} http://localhost:{port}/ready",
-                timeout=timeout + 5,
-                check=False
-            )
-            return result.returncode == 0
+            status, _ = self._http_request(port, "/ready", timeout=timeout)
+            return status == 200
+        except Exception:
+            return False
+
+    def _active_health_ok(self, port: int) -> bool:
+        """Two-tier active health check: a single 3s probe covers the
+        healthy steady state in one round-trip; only on failure fall back
+        to the patient 120s poll that tolerates a slow boot."""
+        if self._quick_health_check(port, timeout=3):
+            self.log("  Active healthy (fast path)")
+            return True
+        return self.check_container_health(port, "/ready", timeout=120, poll_interval=2)
+
+    def _nginx_routing_ok(self, timeout: int = 5) -> bool:
+        """Check that nginx on port 80 is routing /healthz to a backend."""
+        try:
+            status, _ = self._http_request(80, "/healthz", timeout=timeout)
+            return status == 200
         except Exception:
             return False
 
+    def _docker_cached(self, key: tuple, fn, ttl: float = 2.0):
+        """Memoize a docker query for ttl seconds."""
+        now = time.monotonic()
+        hit = self._docker_cache.get(key)
+        if hit is not None and now - hit[0] < ttl:
+            return hit[1]
+        value = fn()
+        self._docker_cache[key] = (now, value)
+        return value
+
+    def _invalidate_docker_cache(self) -> None:
+        """Drop cached docker state after any container mutation."""
+        self._docker_cache.clear()
+
     def _get_container_id(self, color: str) -> str:
         """Get the Docker container ID for a given color."""
-        result = self.run_command(
-            f"docker inspect --format='{{{{.Id}}}}' smollm2-{color}",
-            timeout=10,
-            check=True
-        )
-        return result.stdout.strip().strip("'")
+        def query() -> str:
+            if self.dc is not None:
+                return self.dc.containers.get(f"smollm2-{color}").id
+            result = self.run_command(
+                f"docker inspect --format='{{{{.Id}}}}' smollm2-{color}",
+                timeout=10,
+                check=True
+            )
+            return result.stdout.strip().strip("'")
+
+        return self._docker_cached(("id", color), query)
 
     def _is_container_running(self, color: str) -> bool:
         """Check if a container is currently running."""
-        try:
+        def query() -> bool:
+            if self.dc is not None:
+                try:
+                    return self.dc.containers.get(f"smollm2-{color}").status == "running"
+                except Exception:
+                    return False
+            try:
+                result = self.run_command(
+                    f"docker inspect --format='{{{{.State.Running}}}}' smollm2-{color}",
+                    timeout=10,
+                    check=False
+                )
+                return result.stdout.strip().strip("'") == "true"
+            except Exception:
+                return False
+
+        return self._docker_cached(("running", color), query)
+
+    def _snapshot_containers(self) -> dict:
+        """Describe both colors in one docker round-trip.
+
+        Returns {color: {"running": bool, "id": str}}; a missing
+        container reads as not running. Cached for 500ms so back-to-back
+        lookups within one step share the same fork."""
+        def query() -> dict:
+            snap = {
+                "blue": {"running": False, "id": ""},
+                "green": {"running": False, "id": ""},
+            }
+            if self.dc is not None:
+                for color in snap:
+                    try:
+                        c = self.dc.containers.get(f"smollm2-{color}")
+                        snap[color] = {
+                            "running": c.status == "running", "id": c.id
+                        }
+                    except Exception:
+                        pass
+                return snap
             result = self.run_command(
-                f"docker inspect --format='{{{{.State.Running}}}}' smollm2-{color}",
+                ["docker", "inspect", "--format",
+                 "{{.Name}};{{.State.Running}};{{.Id}}",
+                 "smollm2-blue", "smollm2-green"],
                 timeout=10,
-                check=False
+                check=False,
             )
-            return result.stdout.strip().strip("'") == "true"
-        except Exception:
-            return False
+            for line in result.stdout.splitlines():
+                parts = line.strip().split(";")
+                if len(parts) != 3:
+                    continue
+                color = parts[0].lstrip("/").removeprefix("smollm2-")
+                if color in snap:
+                    snap[color] = {"running": parts[1] == "true", "id": parts[2]}
+            return snap
+
+        return self._docker_cached(("snapshot",), query, ttl=0.5)
+
+    def _inspect_running_id(self, color: str) -> tuple:
+        """Fetch (running, id) for a container from the bulk snapshot."""
+        info = self._snapshot_containers().get(color, {})
+        return info.get("running", False), info.get("id", "")
+
+    def _force_remove(self, color: str) -> None:
+        """SIGKILL and remove a container in one docker round-trip.
+
+        Used on failure cleanup, where the container is already unhealthy
+        and the graceful SIGTERM wait (up to 30s) buys nothing."""
+        if self.dc is not None:
+            try:
+                self.dc.containers.get(f"smollm2-{color}").remove(force=True)
+                self._invalidate_docker_cache()
+                return
+            except Exception:
+                pass  # fall back to the CLI
+        self.run_command(
+            f"docker rm -f smollm2-{color}", timeout=15, check=False
+        )
+
+    def _start_container(self, color: str) -> bool:
+        """Restart an existing stopped container directly, skipping the
+        compose bootstrap. Returns False if the container doesn't exist
+        (caller falls back to compose up for a cold start)."""
+        if self.dc is not None:
+            try:
+                self.dc.containers.get(f"smollm2-{color}").start()
+                self._invalidate_docker_cache()
+                return True
+            except Exception:
+                pass  # fall back to the CLI
+        result = self.run_command(
+            f"docker start smollm2-{color}", timeout=30, check=False
+        )
+        self._invalidate_docker_cache()
+        return result.returncode == 0
 
     def _stop_container(self, color: str) -> None:
         """Stop and remove a container."""
+        if self.dc is not None:
+            try:
+                container = self.dc.containers.get(f"smollm2-{color}")
+                container.stop(timeout=10)
+                container.remove(force=True)
+                self._invalidate_docker_cache()
+                return
+            except Exception:
+                pass  # fall back to the compose CLI
+        # rm -sf stops and removes in one compose invocation instead of two
         self.run_command(
-            f"docker compose --profile deploy stop smollm2-{color}",
-            timeout=30, check=False
-        )
-        self.run_command(
-            f"docker compose --profile deploy rm -f smollm2-{color}",
-            timeout=10, check=False
+            f"docker compose --profile deploy rm -sf smollm2-{color}",
+            timeout=45, check=False
         )
+        self._invalidate_docker_cache()
 
     # ── Helper: check if a compose service is running ─────────────
 
     def _is_service_running(self, service: str, profile: bool = False) -> bool:
-        cmd = "docker compose"
-        if profile:
-            cmd += " --profile deploy"
-        cmd += f" ps {service} --format json"
-        result = self.run_command(cmd, timeout=10, check=False)
-        if not result.stdout.strip():
-            return False
-        try:
-            for line in result.stdout.strip().splitlines():
-                line = line.strip()
-                if line:
-                    c = json.loads(line)
-                    if c.get("State") == "running":
-                        return True
-        except json.JSONDecodeError:
-            return "running" in result.stdout.lower()
-        return False
+        def query() -> bool:
+            # `ps -q` emits only container ids, avoiding the JSON-emitting
+            # compose call and per-line parsing just to find one State.
+            cmd = "docker compose"
+            if profile:
+                cmd += " --profile deploy"
+            cmd += f" ps -q {service}"
+            result = self.run_command(cmd, timeout=10, check=False)
+            container_id = result.stdout.split("\n", 1)[0].strip()
+            if not container_id:
+                return False
+            inspect = self.run_command(
+                f"docker inspect -f {{{{.State.Running}}}} {container_id}",
+                timeout=10,
+                check=False,
+            )
+            return inspect.stdout.strip() == "true"
+
+        return self._docker_cached(("service", service, profile), query)
 
     # ── Pre-flight Checks ─────────────────────────────────────────
 
@@ -257,55 +610,52 @@ class DeploymentOrchestrator:
         standby = state["standby_color"]
         active_port = state["active_port"]
 
-        # 1. Active container running
-        if not self._is_service_running(active):
-            raise DeploymentError(
-                f"Active container '{active}' is not running"
-            )
-        self.log(f"  {active} container is running")
+        # Catch a broken upstream template now, long before the swap's
+        # point of no return, when host nginx is available.
+        self._validate_templates_host()
 
-        # 2. Active container healthy
+        # 1-4. Independent checks fan out concurrently; the active health
+        # poll is the long pole, the rest no longer add to its latency.
         self.log(f"  Checking {active} readiness on port {active_port}...")
-        healthy = self.check_container_health(active_port, timeout=120, poll_interval=2)
-        if not healthy:
-            raise DeploymentError(
-                f"Active container '{active}' is not healthy on port {active_port}"
-            )
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            fut_active = ex.submit(self._is_service_running, active)
+            fut_health = ex.submit(self._active_health_ok, active_port)
+            fut_nginx = ex.submit(self._is_service_running, "nginx")
+            fut_routing = ex.submit(self._nginx_routing_ok)
+            fut_standby = ex.submit(self._is_service_running, standby, True)
+
+            if not fut_active.result():
+                raise DeploymentError(
+                    f"Active container '{active}' is not running"
+                )
+            self.log(f"  {active} container is running")
 
-        # 3. Nginx running
-        if not self._is_service_running("nginx"):
-            raise DeploymentError("Nginx container is not running")
-        self.log("  Nginx is running")
+            if not fut_nginx.result():
+                raise DeploymentError("Nginx container is not running")
+            self.log("  Nginx is running")
 
-        # 4. Nginx routing to active
-        try:
-            r = subprocess.run(
-                ["curl", "-sf", "--max-time", "5", "http://localhost/healthz"],
-                capture_output=True,
-                text=True,
-                timeout=10,
-            )
-            if r.returncode != 0:
+            if not fut_routing.result():
                 raise DeploymentError(
                     "Nginx is not routing traffic (port 80 /healthz failed)"
                 )
-        except subprocess.TimeoutExpired:
-            raise DeploymentError("Nginx health check timed out")
-        self.log("  Nginx routing OK via port 80")
+            self.log("  Nginx routing OK via port 80")
+
+            if not fut_health.result():
+                raise DeploymentError(
+                    f"Active container '{active}' is not healthy on port {active_port}"
+                )
+
+            standby_running = fut_standby.result()
 
         # 5. No leftover standby container
-        if self._is_service_running(standby, profile=True):
+        if standby_running:
             self.log(f"  Leftover {standby} container found, stopping it...")
             self.run_command(
-                f"docker compose --profile deploy stop {standby}",
-                timeout=30,
-                check=False,
-            )
-            self.run_command(
-                f"docker compose --profile deploy rm -f {standby}",
-                timeout=10,
+                f"docker compose --profile deploy rm -sf {standby}",
+                timeout=45,
                 check=False,
             )
+            self._invalidate_docker_cache()
 
         # 6. Disk space (informational)
         self.run_command("docker system df", timeout=10, check=False)
@@ -316,12 +666,14 @@ class DeploymentOrchestrator:
     def start_standby(self, state: dict) -> None:
         standby = state["standby_color"]
         self.log(f"  Starting {standby} container...")
+        # --wait blocks until the container healthcheck passes (or the
+        # timeout expires), replacing the old blind 5s sleep.
         self.run_command(
-            f"docker compose --profile deploy up -d {standby}", timeout=30
+            f"docker compose --profile deploy up -d --wait --wait-timeout 30 {standby}",
+            timeout=45,
+            check=False,
         )
-
-        # Wait for Docker to initialize
-        time.sleep(5)
+        self._invalidate_docker_cache()
 
         # Verify container is running
         if not self._is_service_running(standby, profile=True):
@@ -333,159 +685,281 @@ class DeploymentOrchestrator:
             self.log(f"  Container logs:\n{logs.stdout}", level="ERROR")
             raise DeploymentError(f"Container '{standby}' failed to start")
 
-    def warmup_inference(self, port: int) -> None:
-        self.log(f"  Sending warm-up inference to port {port}...")
-        start = time.time()
+    def _one_warmup(self, port: int, max_tokens: int) -> str:
+        """Send one warm-up /chat request on its own connection (safe to
+        run concurrently with the shared keep-alive connections)."""
+        payload = json.dumps(
+            {"message": "Hello, respond in one word.", "max_tokens": max_tokens}
+        )
+        conn = http.client.HTTPConnection("localhost", port, timeout=35)
         try:
-            result = subprocess.run(
-                [
-                    "curl",
-                    "-sf",
-                    "--max-time",
-                    "30",
-                    "-X",
-                    "POST",
-                    f"http://localhost:{port}/chat",
-                    "-H",
-                    "Content-Type: application/json",
-                    "-d",
-                    json.dumps(
-                        {"message": "Hello, respond in one word.", "max_tokens": 10}
-                    ),
-                ],
-                capture_output=True,
-                text=True,
-                timeout=35,
+            conn.request(
+                "POST",
+                "/chat",
+                body=payload,
+                headers={"Content-Type": "application/json"},
             )
-            elapsed = round(time.time() - start, 1)
-
-            if result.returncode != 0:
-                raise DeploymentError(
-                    f"Warm-up inference failed (curl rc={result.returncode}): "
-                    f"{result.stderr}"
-                )
-
-            body = json.loads(result.stdout)
-            if "response" in body:
-                self.log(
-                    f"  Warm-up OK in {elapsed}s: "
-                    f"{body['response'][:50]}..."
-                )
-            else:
-                raise DeploymentError(
-                    f"Warm-up response missing 'response' field: {body}"
-                )
+            resp = conn.getresponse()
+            data = resp.read()
+        except Exception as e:
+            raise DeploymentError(
+                f"Warm-up inference failed ({type(e).__name__}: {e})"
+            )
+        finally:
+            conn.close()
 
+        if resp.status != 200:
+            raise DeploymentError(f"Warm-up inference failed (HTTP {resp.status})")
+        try:
+            body = json.loads(data)
         except json.JSONDecodeError:
             raise DeploymentError(
-                f"Warm-up returned non-JSON: {result.stdout[:200]}"
+                f"Warm-up returned non-JSON: {data[:200]!r}"
             )
-        except subprocess.TimeoutExpired:
-            raise DeploymentError("Warm-up inference timed out after 30s")
+        if "response" not in body:
+            raise DeploymentError(
+                f"Warm-up response missing 'response' field: {body}"
+            )
+        return body["response"]
+
+    def warmup_inference(self, port: int) -> None:
+        # A single request only warms one generation path; a small burst
+        # with varied max_tokens exercises several batch shapes and fills
+        # the model's caches in the same wall time.
+        self.log(f"  Sending warm-up burst (3 requests) to port {port}...")
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=3) as ex:
+            futures = [
+                ex.submit(self._one_warmup, port, n) for n in (4, 16, 32)
+            ]
+            responses = [f.result(timeout=40) for f in futures]
+        elapsed = round(time.time() - start, 1)
+        self.log(f"  Warm-up OK in {elapsed}s: {responses[0][:50]}...")
 
     # ── Nginx Management ──────────────────────────────────────────
 
+    def _upstream_template(self, color: str) -> str:
+        """Return the cached upstream template.
+
+        A single stat per call catches templates edited (or created)
+        after init; otherwise the cached text is served without any
+        file I/O."""
+        path = self.nginx_templates_dir / f"upstream-{color}.conf"
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            return self._upstream_templates[color]
+        if self._upstream_mtimes.get(color) != mtime:
+            self._upstream_templates[color] = path.read_text()
+            self._upstream_mtimes[color] = mtime
+        return self._upstream_templates[color]
+
     def swap_nginx(self, target_color: str) -> str:
         default_conf = self.nginx_conf_dir / "default.conf"
-        template = self.nginx_templates_dir / f"upstream-{target_color}.conf"
+        template_text = self._upstream_template(target_color)
 
         # 1. Read current config as backup
         original_config = default_conf.read_text()
 
+        # Idempotent swap: if the active config already matches the
+        # target template, skip the write and the ~1s test+reload exec.
+        if original_config == template_text:
+            self.log(f"  default.conf already routes to {target_color}, skipping reload")
+            return original_config
+
         # 2. Copy template to active config
-        default_conf.write_text(template.read_text())
+        default_conf.write_text(template_text)
         self.log(f"  Wrote upstream-{target_color}.conf -> conf.d/default.conf")
 
-        # 3. Test nginx config
-        try:
-            self.run_command("docker exec smollm2-nginx nginx -t", timeout=5)
-        except DeploymentError as e:
-            self.log("  nginx -t failed, restoring original config...", level="ERROR")
-            default_conf.write_text(original_config)
-            raise DeploymentError(f"Nginx config test failed: {e}")
-
-        # 4. Reload nginx
+        # 3-4. Test and reload in one docker exec round-trip; the exec
+        # itself costs ~150-300ms so halving the count matters inside the
+        # no-rollback window. Known-good configs skip the test pass.
         try:
-            self.run_command(
-                "docker exec smollm2-nginx nginx -s reload", timeout=5
-            )
+            self._reload_nginx(template_text)
         except DeploymentError as e:
             self.log(
-                "  nginx reload failed, restoring original config...",
+                "  nginx test+reload failed, restoring original config...",
                 level="ERROR",
             )
             default_conf.write_text(original_config)
             try:
-                self.run_command(
-                    "docker exec smollm2-nginx nginx -s reload", timeout=5
-                )
+                self._nginx_test_and_reload()
             except Exception:
                 pass
-            raise DeploymentError(f"Nginx reload failed: {e}")
+            raise DeploymentError(f"Nginx config swap failed: {e}")
 
         return original_config
 
-    def verify_traffic_switched(self, target_port: int) -> bool:
-        self.log("  Sending 3 verification requests via nginx...")
-        successes = 0
-        for i in range(3):
+    def _nginx_test_and_reload(self) -> None:
+        if self.dc is not None:
             try:
-                result = subprocess.run(
-                    [
-                        "curl",
-                        "-sf",
-                        "--max-time",
-                        "5",
-                        "http://localhost/healthz",
-                    ],
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
+                rc, output = self.dc.containers.get("smollm2-nginx").exec_run(
+                    ["sh", "-c", "nginx -t && nginx -s reload"]
                 )
-                if result.returncode == 0:
-                    body = json.loads(result.stdout)
-                    if body.get("status") == "alive":
-                        successes += 1
-                        self.log(f"  Verification {i + 1}/3: OK")
-                    else:
+                if rc != 0:
+                    raise DeploymentError(
+                        f"nginx test+reload failed: {output.decode(errors='replace').strip()}"
+                    )
+                return
+            except DeploymentError:
+                raise
+            except Exception:
+                pass  # fall back to the CLI
+        self.run_command(
+            ["docker", "exec", "smollm2-nginx", "sh", "-c",
+             "nginx -t && nginx -s reload"],
+            timeout=8,
+        )
+
+    def _reload_nginx(self, config_text: str) -> None:
+        """Reload nginx, skipping the explicit nginx -t pass when this
+        exact config already validated once. The reload itself re-parses
+        the config and refuses a broken one, so the skip trades only the
+        redundant second parse, not safety."""
+        digest = hashlib.sha256(config_text.encode()).hexdigest()
+        if digest in self._verified_hashes:
+            # SIGHUP over the SDK's existing socket is nginx's reload
+            # signal without even the exec round-trip
+            if self.dc is not None:
+                try:
+                    self.dc.containers.get("smollm2-nginx").kill(signal="SIGHUP")
+                    return
+                except Exception:
+                    pass  # fall back to the CLI
+            self.run_command(
+                ["docker", "exec", "smollm2-nginx", "nginx", "-s", "reload"],
+                timeout=8,
+            )
+            return
+        self._nginx_test_and_reload()
+        self._verified_hashes.add(digest)
+        try:
+            self.verified_hash_file.write_text(
+                json.dumps(sorted(self._verified_hashes)) + "\n"
+            )
+        except OSError:
+            pass
+
+    def _probe_healthz(self, i: int, expect_color: str | None = None) -> bool:
+        """One /healthz probe via nginx on its own connection (safe to run
+        concurrently with the shared keep-alive connections).
+
+        When expect_color is given and nginx sends the X-Upstream-Color
+        header, the probe also confirms which upstream answered."""
+        conn = http.client.HTTPConnection("localhost", 80, timeout=5)
+        try:
+            conn.request("GET", "/healthz")
+            resp = conn.getresponse()
+            if resp.status == 200:
+                served_by = resp.getheader("X-Upstream-Color")
+                body = json.loads(resp.read())
+                if body.get("status") == "alive":
+                    if expect_color and served_by and served_by != expect_color:
                         self.log(
                             f"  Verification {i + 1}/3: "
-                            f"unexpected status {body.get('status')}"
+                            f"served by {served_by}, expected {expect_color}"
                         )
-                else:
-                    self.log(
-                        f"  Verification {i + 1}/3: "
-                        f"failed (rc={result.returncode})"
-                    )
-            except Exception as e:
-                self.log(f"  Verification {i + 1}/3: error ({e})")
-            if i < 2:
-                time.sleep(1)
+                        return False
+                    self.log(f"  Verification {i + 1}/3: OK")
+                    return True
+                self.log(
+                    f"  Verification {i + 1}/3: "
+                    f"unexpected status {body.get('status')}"
+                )
+            else:
+                self.log(f"  Verification {i + 1}/3: failed (HTTP {resp.status})")
+        except Exception as e:
+            self.log(f"  Verification {i + 1}/3: error ({e})")
+        finally:
+            conn.close()
+        return False
+
+    def verify_traffic_switched(
+        self, target_port: int, target_color: str | None = None
+    ) -> bool:
+        self.log("  Sending 3 verification requests via nginx...")
+        with ThreadPoolExecutor(max_workers=3) as ex:
+            results = list(
+                ex.map(lambda i: self._probe_healthz(i, target_color), range(3))
+            )
+        return all(results)
 
-        return successes == 3
+    def _verify_switched_settled(
+        self, target_port: int, target_color: str | None = None
+    ) -> bool:
+        """Wait for nginx workers to pick up the reload, then verify.
+
+        Polls a single probe at 50ms (2s cap) until the target color
+        answers, so one request served by a not-yet-recycled old worker
+        doesn't fail a healthy swap; then runs the full 3-probe check."""
+        deadline = time.time() + 2
+        while time.time() < deadline:
+            if self._probe_healthz(0, target_color):
+                return self.verify_traffic_switched(target_port, target_color)
+            time.sleep(0.05)
+        return False
 
     def rollback_nginx(self, original_config: str) -> None:
         default_conf = self.nginx_conf_dir / "default.conf"
         default_conf.write_text(original_config)
-        self.run_command("docker exec smollm2-nginx nginx -t", timeout=5)
-        self.run_command("docker exec smollm2-nginx nginx -s reload", timeout=5)
+        self._reload_nginx(original_config)
         self.log("  Nginx rolled back to previous upstream")
 
-    def drain_and_stop_old(self, old_color: str, drain_seconds: int = 15) -> None:
+    def _wait_drain(self, old_port: int, max_wait: int) -> None:
+        """Wait for in-flight requests on the old container to reach zero,
+        polling /health/deep every 200ms, instead of sleeping the full
+        drain window. Falls back to the blind wait if the endpoint is
+        unreachable; busy deployments still get the full window."""
+        if max_wait <= 0:
+            return
+        start = time.time()
+        deadline = start + max_wait
+        quiescent_polls = 0
+        while time.time() < deadline:
+            try:
+                status, data = self._http_request(
+                    old_port, "/health/deep", timeout=5
+                )
+                if status == 200 and json.loads(data).get("active_requests", 1) == 0:
+                    # Require two consecutive zero readings so a request
+                    # that lands between polls doesn't get cut off.
+                    quiescent_polls += 1
+                    if quiescent_polls >= 2:
+                        self.log(
+                            f"  Drained early after {round(time.time() - start, 1)}s "
+                            "(no active requests, 2 consecutive polls)"
+                        )
+                        return
+                else:
+                    quiescent_polls = 0
+            except Exception:
+                remaining = deadline - time.time()
+                if remaining > 0:
+                    self.log(
+                        "  Drain status unavailable, falling back to "
+                        f"{round(remaining, 1)}s sleep"
+                    )
+                    time.sleep(remaining)
+                return
+            time.sleep(0.2)
+        self.log(f"  Drain window elapsed ({max_wait}s)")
+
+    def drain_and_stop_old(
+        self, old_color: str, drain_seconds: int = 15, old_port: int | None = None
+    ) -> None:
         if drain_seconds > 0:
-            self.log(f"  Draining {old_color} for {drain_seconds}s...")
-            time.sleep(drain_seconds)
+            self.log(f"  Draining {old_color} for up to {drain_seconds}s...")
+            if old_port is not None:
+                self._wait_drain(old_port, drain_seconds)
+            else:
+                time.sleep(drain_seconds)
         self.log(f"  Stopping {old_color}...")
         self.run_command(
-            f"docker compose --profile deploy stop {old_color}",
+            f"docker compose --profile deploy rm -sf {old_color}",
             timeout=60,
             check=False,
         )
-        self.run_command(
-            f"docker compose --profile deploy rm -f {old_color}",
-            timeout=10,
-            check=False,
-        )
+        self._invalidate_docker_cache()
         self.log(f"  {old_color} stopped and removed")
 
     # ── Pre-Warm Sequence ─────────────────────────────────────────
@@ -527,40 +1001,37 @@ class DeploymentOrchestrator:
         try:
             # Step 1: Pre-flight checks
             self.log("Step 1: Pre-flight checks...")
+            self._validate_templates_host()
 
-            # Check active container is running
-            if not self._is_service_running(active_color):
-                raise DeploymentError(
-                    f"Active container '{active_color}' is not running"
-                )
-            self.log(f"  {active_color} container is running")
-
-            # Check active container healthy
+            # Independent checks fan out concurrently, as in preflight_checks
             self.log(f"  Checking {active_color} readiness on port {active_port}...")
-            healthy = self.check_container_health(active_port, timeout=120, poll_interval=2)
-            if not healthy:
-                raise DeploymentError(
-                    f"Active container '{active_color}' is not healthy on port {active_port}"
-                )
+            with ThreadPoolExecutor(max_workers=4) as ex:
+                fut_active = ex.submit(self._is_service_running, active_color)
+                fut_health = ex.submit(self._active_health_ok, active_port)
+                fut_routing = ex.submit(self._nginx_routing_ok)
+                fut_standby = ex.submit(self._is_container_running, standby_color)
 
-            # Check nginx is routing
-            try:
-                r = subprocess.run(
-                    ["curl", "-sf", "--max-time", "5", "http://localhost/healthz"],
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                )
-                if r.returncode != 0:
+                if not fut_active.result():
+                    raise DeploymentError(
+                        f"Active container '{active_color}' is not running"
+                    )
+                self.log(f"  {active_color} container is running")
+
+                if not fut_routing.result():
                     raise DeploymentError(
                         "Nginx is not routing traffic (port 80 /healthz failed)"
                     )
-            except subprocess.TimeoutExpired:
-                raise DeploymentError("Nginx health check timed out")
-            self.log("  Nginx routing OK via port 80")
+                self.log("  Nginx routing OK via port 80")
+
+                if not fut_health.result():
+                    raise DeploymentError(
+                        f"Active container '{active_color}' is not healthy on port {active_port}"
+                    )
+
+                standby_running = fut_standby.result()
 
             # Check if standby is already running (stale from failed deploy?)
-            if self._is_container_running(standby_color):
+            if standby_running:
                 # Check if it's already pre-warmed
                 if state.get("standby_prewarmed", False):
                     self.log(f"  ⚠️  {standby_color} already pre-warmed at {state.get('standby_prewarmed_at', 'unknown')}")
@@ -612,7 +1083,7 @@ class DeploymentOrchestrator:
             # Step 6: Update state (mark as pre-warmed, but DON'T change active_color)
             elapsed = round(time.time() - prewarm_start, 1)
             state["standby_prewarmed"] = True
-            state["standby_prewarmed_at"] = datetime.now(timezone.utc).isoformat()
+            state["standby_prewarmed_at"] = self._now_iso()
             state["standby_container_id"] = container_id
             self.save_state(state)
 
@@ -707,14 +1178,18 @@ class DeploymentOrchestrator:
             original_nginx_config = self.swap_nginx(target_color)
             self.log("Step 7-9: Nginx reloaded")
 
-            # Step 10: Drain
-            self.log(f"Step 10: Draining old connections ({self.drain_seconds}s)...")
-            time.sleep(self.drain_seconds)
-            self.log("Step 10: Drain complete")
-
-            # Step 11: Verify
+            # Step 10-11: Drain and verify overlap — verification probes
+            # the new target through nginx while the old container drains,
+            # so the happy path pays max() of the two, not the sum.
+            self.log(f"Step 10: Draining old connections (up to {self.drain_seconds}s)...")
             self.log("Step 11: Verifying traffic switch...")
-            switched = self.verify_traffic_switched(target_port)
+            with ThreadPoolExecutor(max_workers=1) as ex:
+                fut_verify = ex.submit(
+                    self._verify_switched_settled, target_port, target_color
+                )
+                self._wait_drain(active_port, self.drain_seconds)
+                switched = fut_verify.result()
+            self.log("Step 10: Drain complete")
             if not switched:
                 raise DeploymentError(
                     "Step 11: Traffic not reaching target after nginx reload"
@@ -728,7 +1203,7 @@ class DeploymentOrchestrator:
 
             # Step 13: Update state
             elapsed = round(time.time() - deployment_start, 1)
-            now = datetime.now(timezone.utc).isoformat()
+            now = self._now_iso()
             new_state = {
                 "active_color": target_color,
                 "active_port": target_port,
@@ -742,18 +1217,16 @@ class DeploymentOrchestrator:
                 "standby_prewarmed": False,
                 "standby_prewarmed_at": None,
                 "standby_container_id": None,
-                "history": state.get("history", [])
-                + [
-                    {
-                        "timestamp": now,
-                        "from_color": active_color,
-                        "to_color": target_color,
-                        "duration_seconds": elapsed,
-                        "success": True,
-                    }
-                ],
             }
-            new_state["history"] = new_state["history"][-20:]
+            self._append_history(
+                {
+                    "timestamp": now,
+                    "from_color": active_color,
+                    "to_color": target_color,
+                    "duration_seconds": elapsed,
+                    "success": True,
+                }
+            )
             self.save_state(new_state)
 
             self.log("=" * 60)
@@ -777,31 +1250,22 @@ class DeploymentOrchestrator:
                         level="CRITICAL",
                     )
 
-            # Always try to stop the standby container on failure
-            self.log(f"Stopping failed {target_color} container...")
+            # Always try to remove the standby container on failure; it's
+            # already unhealthy, so skip the graceful-shutdown wait
+            self.log(f"Removing failed {target_color} container...")
             try:
-                self.run_command(
-                    f"docker compose --profile deploy stop {target_color}",
-                    timeout=30,
-                    check=False,
-                )
-                self.run_command(
-                    f"docker compose --profile deploy rm -f {target_color}",
-                    timeout=10,
-                    check=False,
-                )
-                self.log(f"{target_color} stopped")
+                self._force_remove(target_color)
+                self.log(f"{target_color} removed")
             except Exception:
                 self.log(
                     f"Warning: Could not stop {target_color}", level="WARNING"
                 )
 
             # Record failure in history
-            state = self.read_state()
             elapsed = round(time.time() - deployment_start, 1)
-            state.setdefault("history", []).append(
+            self._append_history(
                 {
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "timestamp": self._now_iso(),
                     "from_color": active_color,
                     "to_color": target_color,
                     "duration_seconds": elapsed,
@@ -809,8 +1273,6 @@ class DeploymentOrchestrator:
                     "error": str(e),
                 }
             )
-            state["history"] = state["history"][-20:]
-            self.save_state(state)
 
             raise
 
@@ -853,6 +1315,7 @@ class DeploymentOrchestrator:
         try:
             # Step 1: Verify pre-warm state
             self.log("Step 1: Checking pre-warm state...")
+            self._validate_templates_host()
             if not state.get("standby_prewarmed", False):
                 raise DeploymentError(
                     "Standby not pre-warmed. Run 'make prewarm' first."
@@ -864,9 +1327,11 @@ class DeploymentOrchestrator:
             # Check staleness - warn if prewarm was more than 1 hour ago
             if state.get("standby_prewarmed_at"):
                 try:
-                    prewarm_dt = datetime.fromisoformat(
-                        state["standby_prewarmed_at"].replace("Z", "+00:00")
-                    )
+                    raw = state["standby_prewarmed_at"]
+                    if sys.version_info < (3, 11):
+                        # older fromisoformat can't parse a trailing Z
+                        raw = raw.replace("Z", "+00:00")
+                    prewarm_dt = datetime.fromisoformat(raw)
                     age_seconds = (datetime.now(timezone.utc) - prewarm_dt).total_seconds()
                     age_minutes = age_seconds / 60
 
@@ -884,7 +1349,9 @@ class DeploymentOrchestrator:
             self.log("Step 2: Verifying container identity...")
             expected_id = state.get("standby_container_id")
 
-            if not self._is_container_running(standby_color):
+            # One inspect answers both the running check and the ID match
+            running, current_id = self._inspect_running_id(standby_color)
+            if not running:
                 raise DeploymentError(
                     f"{standby_color} container is not running. "
                     f"It may have been stopped or OOM-killed since prewarm. "
@@ -892,7 +1359,6 @@ class DeploymentOrchestrator:
                 )
 
             if expected_id:
-                current_id = self._get_container_id(standby_color)
                 if current_id != expected_id:
                     raise DeploymentError(
                         f"Container ID mismatch. Expected {expected_id[:12]}, "
@@ -905,20 +1371,23 @@ class DeploymentOrchestrator:
 
             self.log("Step 2: ✓ Container identity verified")
 
-            # Step 3: Re-verify health (quick, not full poll)
+            # Step 3-4: Health re-check and inference verification are both
+            # read-only HTTP probes against the standby — run them together
             self.log("Step 3: Quick health re-check...")
-            healthy = self._quick_health_check(standby_port, timeout=30)
-            if not healthy:
-                raise DeploymentError(
-                    f"{standby_color} failed quick health check. "
-                    f"Model may have crashed since prewarm. "
-                    f"Run 'make prewarm' again."
+            self.log("Step 4: Quick inference verification...")
+            with ThreadPoolExecutor(max_workers=2) as ex:
+                fut_health = ex.submit(
+                    self._quick_health_check, standby_port, 30
                 )
+                fut_warmup = ex.submit(self.warmup_inference, standby_port)
+                if not fut_health.result():
+                    raise DeploymentError(
+                        f"{standby_color} failed quick health check. "
+                        f"Model may have crashed since prewarm. "
+                        f"Run 'make prewarm' again."
+                    )
+                fut_warmup.result()  # re-raises DeploymentError on failure
             self.log("Step 3: ✓ Standby still healthy")
-
-            # Step 4: Quick inference verification
-            self.log("Step 4: Quick inference verification...")
-            self.warmup_inference(standby_port)
             self.log("Step 4: ✓ Inference working")
 
             # ─── POINT OF NO RETURN ───
@@ -928,15 +1397,17 @@ class DeploymentOrchestrator:
             original_nginx_config = self.swap_nginx(standby_color)
             self.log("Step 5-6: ✓ Nginx reloaded")
 
-            # Step 7: Drain period
+            # Step 7-8: Drain and verify overlap, as in deploy()
             drain = self.drain_seconds
-            self.log(f"Step 7: Draining old connections ({drain}s)...")
-            time.sleep(drain)
-            self.log("Step 7: ✓ Drain complete")
-
-            # Step 8: Verify traffic switched
+            self.log(f"Step 7: Draining old connections (up to {drain}s)...")
             self.log("Step 8: Verifying traffic switch...")
-            switched = self.verify_traffic_switched(standby_port)
+            with ThreadPoolExecutor(max_workers=1) as ex:
+                fut_verify = ex.submit(
+                    self._verify_switched_settled, standby_port, standby_color
+                )
+                self._wait_drain(active_port, drain)
+                switched = fut_verify.result()
+            self.log("Step 7: ✓ Drain complete")
             if not switched:
                 raise DeploymentError("Traffic not reaching standby after nginx reload")
             self.log("Step 8: ✓ Traffic verified on standby")
@@ -948,7 +1419,7 @@ class DeploymentOrchestrator:
 
             # Step 10: Update state
             elapsed = round(time.time() - deploy_start, 1)
-            now = datetime.now(timezone.utc).isoformat()
+            now = self._now_iso()
             new_state = {
                 "active_color": standby_color,
                 "active_port": standby_port,
@@ -960,16 +1431,15 @@ class DeploymentOrchestrator:
                 "standby_prewarmed": False,       # Reset prewarm flags
                 "standby_prewarmed_at": None,
                 "standby_container_id": None,
-                "history": state.get("history", []) + [{
-                    "timestamp": now,
-                    "from_color": active_color,
-                    "to_color": standby_color,
-                    "duration_seconds": elapsed,
-                    "success": True,
-                    "mode": "fast",               # Distinguish from normal deploy
-                }]
             }
-            new_state["history"] = new_state["history"][-20:]
+            self._append_history({
+                "timestamp": now,
+                "from_color": active_color,
+                "to_color": standby_color,
+                "duration_seconds": elapsed,
+                "success": True,
+                "mode": "fast",               # Distinguish from normal deploy
+            })
             self.save_state(new_state)
 
             self.log("=" * 60)
@@ -1001,10 +1471,9 @@ class DeploymentOrchestrator:
                 self.save_state(state)
 
             # Record failure
-            state = self.read_state()
             elapsed = round(time.time() - deploy_start, 1)
-            state.setdefault("history", []).append({
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+            self._append_history({
+                "timestamp": self._now_iso(),
                 "from_color": active_color,
                 "to_color": standby_color,
                 "duration_seconds": elapsed,
@@ -1012,18 +1481,24 @@ class DeploymentOrchestrator:
                 "mode": "fast",
                 "error": str(e),
             })
-            state["history"] = state["history"][-20:]
-            self.save_state(state)
 
             raise
 
     # ── Rollback Command ──────────────────────────────────────────
 
-    def rollback(self) -> None:
+    def rollback(self, target: str | None = None) -> None:
+        """Swap traffic back to the standby, or to an explicit color.
+
+        `target` supports rollback.py's --to flag; when omitted the
+        previous standby is restored."""
         state = self.read_state()
-        target_color = state["standby_color"]
-        target_port = state["standby_port"]
         current_active = state["active_color"]
+        if target is None:
+            target_color = state["standby_color"]
+            target_port = state["standby_port"]
+        else:
+            target_color = target
+            target_port = {"blue": 8000, "green": 8001}[target_color]
 
         self.log("=" * 60)
         self.log(f"ROLLBACK: {current_active} -> {target_color}")
@@ -1032,10 +1507,14 @@ class DeploymentOrchestrator:
         # Check if target container is running; if not, start it
         if not self._is_service_running(target_color, profile=True):
             self.log(f"  {target_color} not running, starting it...")
-            self.run_command(
-                f"docker compose --profile deploy up -d {target_color}",
-                timeout=30,
-            )
+            # docker start on the existing container skips the compose
+            # bootstrap; compose up only for a true cold start.
+            if not self._start_container(target_color):
+                self.run_command(
+                    f"docker compose --profile deploy up -d {target_color}",
+                    timeout=30,
+                )
+                self._invalidate_docker_cache()
             self.log(f"  Waiting for {target_color} health check...")
             healthy = self.check_container_health(target_port, timeout=60)
             if not healthy:
@@ -1043,18 +1522,16 @@ class DeploymentOrchestrator:
                     f"Rollback target '{target_color}' failed health check"
                 )
 
-        # Swap nginx
-        template = self.nginx_templates_dir / f"upstream-{target_color}.conf"
+        # Swap nginx (skip the reload when already routing to target)
         default_conf = self.nginx_conf_dir / "default.conf"
-        default_conf.write_text(template.read_text())
-        self.run_command("docker exec smollm2-nginx nginx -t", timeout=5)
-        self.run_command(
-            "docker exec smollm2-nginx nginx -s reload", timeout=5
-        )
+        template_text = self._upstream_template(target_color)
+        if default_conf.exists() and default_conf.read_text() == template_text:
+            self.log(f"  default.conf already routes to {target_color}, skipping reload")
+        else:
+            default_conf.write_text(template_text)
+            self._reload_nginx(template_text)
 
-        # Verify
-        time.sleep(2)
-        switched = self.verify_traffic_switched(target_port)
+        switched = self._verify_switched_settled(target_port, target_color)
         if not switched:
             self.log(
                 "WARNING: Traffic verification failed after rollback",
@@ -1062,31 +1539,29 @@ class DeploymentOrchestrator:
             )
 
         # Update state
-        now = datetime.now(timezone.utc).isoformat()
+        now = self._now_iso()
         new_state = {
             "active_color": target_color,
             "active_port": target_port,
-            "standby_color": current_active,
-            "standby_port": state["active_port"],
+            "standby_color": "green" if target_color == "blue" else "blue",
+            "standby_port": 8001 if target_port == 8000 else 8000,
             "last_deployment": now,
             "last_model_version": state.get("last_model_version", "unknown"),
             "deployment_count": state.get("deployment_count", 0) + 1,
             "standby_prewarmed": False,
             "standby_prewarmed_at": None,
             "standby_container_id": None,
-            "history": state.get("history", [])
-            + [
-                {
-                    "timestamp": now,
-                    "from_color": current_active,
-                    "to_color": target_color,
-                    "duration_seconds": 0,
-                    "success": True,
-                    "rollback": True,
-                }
-            ],
         }
-        new_state["history"] = new_state["history"][-20:]
+        self._append_history(
+            {
+                "timestamp": now,
+                "from_color": current_active,
+                "to_color": target_color,
+                "duration_seconds": 0,
+                "success": True,
+                "rollback": True,
+            }
+        )
         self.save_state(new_state)
 
         self.log("=" * 60)
@@ -1095,7 +1570,63 @@ class DeploymentOrchestrator:
 
     # ── Status & History ──────────────────────────────────────────
 
+    def _memory_usage_lines(self) -> list:
+        """Memory usage per smollm2 container without docker stats.
+
+        docker stats --no-stream samples CPU for ~1s per call; one bulk
+        inspect for the PIDs plus a VmRSS read from /proc costs ~20ms.
+        Falls back to a name-scoped docker stats when /proc isn't the
+        container's (e.g. remote DOCKER_HOST)."""
+        names = ["smollm2-blue", "smollm2-green", "smollm2-nginx"]
+        result = self.run_command(
+            ["docker", "inspect", "--format",
+             "{{.Name}};{{.State.Pid}};{{.HostConfig.Memory}}"] + names,
+            timeout=10,
+            check=False,
+        )
+        lines = ["NAME            RSS        LIMIT"]
+        parsed = False
+        for raw in result.stdout.splitlines():
+            parts = raw.strip().split(";")
+            if len(parts) != 3 or not parts[1].isdigit() or parts[1] == "0":
+                continue
+            name = parts[0].lstrip("/")
+            try:
+                with open(f"/proc/{parts[1]}/status") as f:
+                    rss_kb = next(
+                        int(line.split()[1])
+                        for line in f
+                        if line.startswith("VmRSS:")
+                    )
+            except (OSError, StopIteration, ValueError):
+                continue
+            limit = int(parts[2])
+            limit_str = f"{limit / (1 << 20):.0f}MiB" if limit else "unlimited"
+            lines.append(
+                f"{name:<15} {rss_kb / 1024:>7.1f}MiB {limit_str:>9}"
+            )
+            parsed = True
+        if parsed:
+            return lines
+        result = self.run_command(
+            ["docker", "stats", "--no-stream", "--format",
+             "table {{.Name}}\t{{.MemUsage}}\t{{.MemPerc}}"] + names,
+            timeout=10,
+            check=False,
+        )
+        return result.stdout.strip().splitlines()
+
     def status(self) -> None:
+        # Buffer the whole report and emit it in one write, so scripts
+        # parsing the output see a single atomic chunk instead of one
+        # write syscall per print.
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
+            self._render_status()
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
+
+    def _render_status(self) -> None:
         state = self.read_state()
         print(f"\n{'=' * 50}")
         print("  Deployment State")
@@ -1113,39 +1644,49 @@ class DeploymentOrchestrator:
         print(f"  Model:       {state.get('last_model_version', 'unknown')}")
         print()
 
-        # Container status
-        print("  Container Status:")
-        result = self.run_command(
-            "docker compose --profile deploy ps", timeout=10, check=False
-        )
-        if result.stdout.strip():
-            for line in result.stdout.strip().splitlines():
-                print(f"    {line}")
-        print()
+        # docker ps, the memory probe, the nginx conf read, and the
+        # standby probes are independent — fan them out and render in
+        # fixed order once all complete.
+        default_conf = self.nginx_conf_dir / "default.conf"
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            fut_ps = ex.submit(
+                self.run_command,
+                ["docker", "ps", "-a", "--filter", "name=smollm2-",
+                 "--format", "table {{.Names}}\t{{.Status}}\t{{.Ports}}"],
+                10, False,
+            )
+            fut_mem = ex.submit(self._memory_usage_lines)
+            fut_conf = ex.submit(
+                lambda: default_conf.read_text() if default_conf.exists() else ""
+            )
+            fut_standby_running = None
+            if state.get("standby_prewarmed", False):
+                fut_standby_running = ex.submit(
+                    lambda: self._snapshot_containers()[
+                        state["standby_color"]
+                    ]["running"]
+                )
 
-        # Memory usage
-        print("  Memory Usage:")
-        result = self.run_command(
-            "docker stats --no-stream --format"
-            " table {{.Name}}\t{{.MemUsage}}\t{{.MemPerc}}",
-            timeout=10,
-            check=False,
-        )
-        if result.stdout.strip():
-            for line in result.stdout.strip().splitlines():
-                if "smollm2" in line.lower() or "NAME" in line:
+            # Container status
+            print("  Container Status:")
+            result = fut_ps.result()
+            if result.stdout.strip():
+                for line in result.stdout.strip().splitlines():
                     print(f"    {line}")
-        print()
+            print()
 
-        # Active nginx config
-        print("  Nginx Upstream:")
-        default_conf = self.nginx_conf_dir / "default.conf"
-        if default_conf.exists():
-            content = default_conf.read_text()
-            for line in content.splitlines():
+            # Memory usage
+            print("  Memory Usage:")
+            for line in fut_mem.result():
+                print(f"    {line}")
+            print()
+
+            # Active nginx config
+            print("  Nginx Upstream:")
+            for line in fut_conf.result().splitlines():
                 if "server " in line and "listen" not in line:
                     print(f"    {line.strip()}")
-        print()
+            print()
 
         # Pre-warm status
         if state.get("standby_prewarmed", False):
@@ -1153,7 +1694,7 @@ class DeploymentOrchestrator:
             prewarm_at = state.get("standby_prewarmed_at", "unknown")
             container_id = state.get("standby_container_id", "unknown")
 
-            is_running = self._is_container_running(standby_color)
+            is_running = fut_standby_running.result()
 
             print(f"  Pre-warm Status:")
             print(f"    Standby:     {standby_color} (pre-warmed)")
@@ -1175,8 +1716,27 @@ class DeploymentOrchestrator:
         print(f"{'=' * 50}\n")
 
     def show_history(self) -> None:
-        state = self.read_state()
-        history = state.get("history", [])
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
+            self._render_history()
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
+
+    def _render_history(self) -> None:
+        # read_state() migrates any legacy embedded history into the log
+        self.read_state()
+        # deque tail keeps only the last 20 lines in memory and only
+        # those get JSON-parsed; reversed() then walks newest-first
+        # without materializing another list
+        history: deque = deque(maxlen=20)
+        if self.history_file.exists():
+            with open(self.history_file) as f:
+                lines = deque(f, maxlen=20)
+            for line in lines:
+                try:
+                    history.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
 
         if not history:
             print("No deployment history.")
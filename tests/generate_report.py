@@ -13,134 +13,270 @@ Usage:
 """
 
 import csv
+import io
 import os
 import sys
 import argparse
-from pathlib import Path
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import datetime
 
+try:
+    # Optional: pandas' C parser is 5-20x faster on large stats CSVs;
+    # the csv-module path below remains the dependency-free fallback.
+    import pandas as pd
+except ImportError:
+    pd = None
+
+# Locust column name -> internal key
+_STATS_COLUMNS = {
+    "Request Count": "request_count",
+    "Failure Count": "failure_count",
+    "Average Response Time": "avg_response_time",
+    "Min Response Time": "min_response_time",
+    "Max Response Time": "max_response_time",
+    "50%": "p50",
+    "95%": "p95",
+    "99%": "p99",
+    "Requests/s": "rps",
+}
+
+
+@dataclass(slots=True, frozen=True)
+class EndpointStats:
+    """One parsed stats row — slotted, so no per-row dict overhead."""
+    request_count: int
+    failure_count: int
+    avg_response_time: float
+    min_response_time: float
+    max_response_time: float
+    p50: float
+    p95: float
+    p99: float
+    rps: float
+
 
 def parse_stats_csv(filepath: str) -> dict:
-    """Parse a Locust _stats.csv file and return aggregated metrics."""
+    """Parse a Locust _stats.csv file into EndpointStats keyed by name."""
+    if pd is not None:
+        df = pd.read_csv(
+            filepath,
+            engine="c",
+            usecols=["Name", *_STATS_COLUMNS],
+            dtype={"Name": "string"},
+        )
+        records = df.rename(columns=_STATS_COLUMNS).set_index("Name").to_dict(
+            orient="index"
+        )
+        return {name: EndpointStats(**rec) for name, rec in records.items()}
+
     results = {}
     with open(filepath) as f:
         reader = csv.DictReader(f)
         for row in reader:
             name = row.get("Name", "")
-            results[name] = {
-                "request_count": int(row.get("Request Count", 0)),
-                "failure_count": int(row.get("Failure Count", 0)),
-                "avg_response_time": float(row.get("Average Response Time", 0)),
-                "min_response_time": float(row.get("Min Response Time", 0)),
-                "max_response_time": float(row.get("Max Response Time", 0)),
-                "p50": float(row.get("50%", 0)),
-                "p95": float(row.get("95%", 0)),
-                "p99": float(row.get("99%", 0)),
-                "rps": float(row.get("Requests/s", 0)),
-            }
+            results[name] = EndpointStats(
+                request_count=int(row.get("Request Count", 0)),
+                failure_count=int(row.get("Failure Count", 0)),
+                avg_response_time=float(row.get("Average Response Time", 0)),
+                min_response_time=float(row.get("Min Response Time", 0)),
+                max_response_time=float(row.get("Max Response Time", 0)),
+                p50=float(row.get("50%", 0)),
+                p95=float(row.get("95%", 0)),
+                p99=float(row.get("99%", 0)),
+                rps=float(row.get("Requests/s", 0)),
+            )
     return results
 
 
+# Per-scenario rollup of the "Aggregated" row, computed once and shared by
+# the summary table and the key-findings sections
+_AggSummary = namedtuple(
+    "_AggSummary",
+    ["request_count", "failure_count", "fail_pct",
+     "avg_response_time", "p95", "p99", "rps"],
+)
+
+
+def _agg_summary(data: dict) -> "_AggSummary | None":
+    agg = data.get("Aggregated")
+    if agg is None:
+        return None
+    return _AggSummary(
+        request_count=agg.request_count,
+        failure_count=agg.failure_count,
+        fail_pct=100 * agg.failure_count / max(agg.request_count, 1),
+        avg_response_time=agg.avg_response_time,
+        p95=agg.p95,
+        p99=agg.p99,
+        rps=agg.rps,
+    )
+
+
+# Row templates compiled once for the non-pandas table paths
+_SUMMARY_ROW_TMPL = (
+    "| {name} | {total} | {failed} | {fail_pct:.1f}% | "
+    "{avg:.0f} | {p95:.0f} | {p99:.0f} | {rps:.1f} |\n"
+)
+_ENDPOINT_ROW_TMPL = (
+    "| {name} | {c} | {f} | {avg:.0f} | {p95:.0f} | {p99:.0f} |\n"
+)
+
+
+def _summary_table(summaries: dict) -> str:
+    """Render the scenario-summary table, vectorized when pandas is around."""
+    rows = [(name, agg) for name, agg in summaries.items() if agg is not None]
+    # An empty frame has no columns to select; the loop below emits a
+    # headers-only table for that case
+    if pd is not None and rows:
+        try:
+            df = pd.DataFrame([agg._asdict() for _, agg in rows],
+                              index=[name for name, _ in rows])
+            df.index.name = "Scenario"
+            df.columns = ["Total Requests", "Failed", "Fail %",
+                          "Avg Latency (ms)", "P95 (ms)", "P99 (ms)", "RPS"]
+            return df.to_markdown(floatfmt=".1f") + "\n"
+        except ImportError:
+            # to_markdown needs tabulate; fall through to the loop
+            pass
+
+    out = [
+        "| Scenario | Total Requests | Failed | Fail % | Avg Latency (ms) | P95 (ms) | P99 (ms) | RPS |\n",
+        "|----------|---------------|--------|--------|-------------------|----------|----------|-----|\n",
+    ]
+    for name, agg in rows:
+        out.append(_SUMMARY_ROW_TMPL.format(
+            name=name, total=agg.request_count, failed=agg.failure_count,
+            fail_pct=agg.fail_pct, avg=agg.avg_response_time,
+            p95=agg.p95, p99=agg.p99, rps=agg.rps,
+        ))
+    return "".join(out)
+
+
+def _endpoint_table(data: dict) -> str:
+    """Render one scenario's per-endpoint breakdown table."""
+    endpoints = {name: m for name, m in data.items() if name != "Aggregated"}
+    # A scenario where no requests completed has only the Aggregated
+    # row; column-selecting an empty frame raises, so keep such
+    # scenarios on the headers-only loop below
+    if pd is not None and endpoints:
+        try:
+            df = pd.DataFrame.from_dict(
+                {name: asdict(m) for name, m in endpoints.items()},
+                orient="index",
+            )
+            df = df[["request_count", "failure_count",
+                     "avg_response_time", "p95", "p99"]]
+            df.index.name = "Endpoint"
+            df.columns = ["Requests", "Failed", "Avg (ms)",
+                          "P95 (ms)", "P99 (ms)"]
+            return df.to_markdown(floatfmt=".0f") + "\n"
+        except ImportError:
+            pass
+
+    out = [
+        "| Endpoint | Requests | Failed | Avg (ms) | P95 (ms) | P99 (ms) |\n",
+        "|----------|----------|--------|----------|----------|----------|\n",
+    ]
+    for endpoint, metrics in endpoints.items():
+        out.append(_ENDPOINT_ROW_TMPL.format(
+            name=endpoint, c=metrics.request_count,
+            f=metrics.failure_count, avg=metrics.avg_response_time,
+            p95=metrics.p95, p99=metrics.p99,
+        ))
+    return "".join(out)
+
+
 def generate_report(results_dir: str) -> str:
     """Generate a markdown performance report from all CSV files in results_dir."""
-    results_path = Path(results_dir)
-    scenarios = {}
-
-    # Find and parse all stats CSVs
-    for csv_file in sorted(results_path.glob("*_stats.csv")):
-        scenario_name = csv_file.stem.replace("_stats", "")
-        scenarios[scenario_name] = parse_stats_csv(str(csv_file))
+    # scandir skips pathlib's per-entry Path allocation; sort the plain
+    # path strings so output stays deterministic
+    try:
+        csv_files = sorted(
+            e.path for e in os.scandir(results_dir)
+            if e.name.endswith("_stats.csv")
+        )
+    except FileNotFoundError:
+        csv_files = []
 
-    if not scenarios:
+    if not csv_files:
         return "No results found in " + results_dir
 
-    # Build report
-    report = []
-    report.append("# Zero-Downtime ML Deployment — Performance Report")
-    report.append(f"\n**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    report.append(f"**Results Directory**: `{results_dir}`")
-    report.append(f"**System**: 8GB Mac, SmolLM2-1.7B INT4 GGUF, CPU-only inference")
-    report.append("")
+    # Parse all stats CSVs in parallel, capped at the core count so a
+    # big results directory doesn't fork one interpreter per file
+    workers = min(len(csv_files), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        parsed = executor.map(parse_stats_csv, csv_files)
 
-    # ── Summary Table ──
-    report.append("## Scenario Summary")
-    report.append("")
-    report.append("| Scenario | Total Requests | Failed | Fail % | Avg Latency (ms) | P95 (ms) | P99 (ms) | RPS |")
-    report.append("|----------|---------------|--------|--------|-------------------|----------|----------|-----|")
+    scenarios = {
+        os.path.basename(f)[: -len("_stats.csv")]: data
+        for f, data in zip(csv_files, parsed)
+    }
+    summaries = {name: _agg_summary(data) for name, data in scenarios.items()}
 
-    for name, data in scenarios.items():
-        agg = data.get("Aggregated", {})
-        if not agg:
-            continue
-        total = agg["request_count"]
-        failed = agg["failure_count"]
-        fail_pct = (100 * failed / max(total, 1))
-        report.append(
-            f"| {name} | {total} | {failed} | {fail_pct:.1f}% | "
-            f"{agg['avg_response_time']:.0f} | {agg['p95']:.0f} | "
-            f"{agg['p99']:.0f} | {agg['rps']:.1f} |"
-        )
+    # Build report into a single in-memory buffer
+    buf = io.StringIO()
+    w = buf.write
+    w("# Zero-Downtime ML Deployment — Performance Report\n")
+    w(f"\n**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    w(f"**Results Directory**: `{results_dir}`\n")
+    w("**System**: 8GB Mac, SmolLM2-1.7B INT4 GGUF, CPU-only inference\n")
+    w("\n")
 
-    report.append("")
+    # ── Summary Table ──
+    w("## Scenario Summary\n")
+    w("\n")
+    w(_summary_table(summaries))
+    w("\n")
 
     # ── Endpoint Breakdown ──
-    report.append("## Endpoint Breakdown")
-    report.append("")
+    w("## Endpoint Breakdown\n")
+    w("\n")
 
     for name, data in scenarios.items():
-        report.append(f"### {name}")
-        report.append("")
-        report.append("| Endpoint | Requests | Failed | Avg (ms) | P95 (ms) | P99 (ms) |")
-        report.append("|----------|----------|--------|----------|----------|----------|")
-
-        for endpoint, metrics in data.items():
-            if endpoint == "Aggregated":
-                continue
-            report.append(
-                f"| {endpoint} | {metrics['request_count']} | "
-                f"{metrics['failure_count']} | {metrics['avg_response_time']:.0f} | "
-                f"{metrics['p95']:.0f} | {metrics['p99']:.0f} |"
-            )
-        report.append("")
+        w(f"### {name}\n")
+        w("\n")
+        w(_endpoint_table(data))
+        w("\n")
 
     # ── Key Findings ──
-    report.append("## Key Findings")
-    report.append("")
+    w("## Key Findings\n")
+    w("\n")
 
     # Analyze baseline
-    baseline = scenarios.get("baseline", {}).get("Aggregated", {})
+    baseline = summaries.get("baseline")
     if baseline:
-        report.append(f"**Baseline Performance** (single instance, no deployment):")
-        report.append(f"- Average latency: {baseline['avg_response_time']:.0f}ms")
-        report.append(f"- P95 latency: {baseline['p95']:.0f}ms")
-        report.append(f"- P99 latency: {baseline['p99']:.0f}ms")
-        report.append(f"- Throughput: {baseline['rps']:.1f} req/s")
-        report.append(f"- Error rate: {100 * baseline['failure_count'] / max(baseline['request_count'], 1):.1f}%")
-        report.append("")
+        w("**Baseline Performance** (single instance, no deployment):\n")
+        w(f"- Average latency: {baseline.avg_response_time:.0f}ms\n")
+        w(f"- P95 latency: {baseline.p95:.0f}ms\n")
+        w(f"- P99 latency: {baseline.p99:.0f}ms\n")
+        w(f"- Throughput: {baseline.rps:.1f} req/s\n")
+        w(f"- Error rate: {baseline.fail_pct:.1f}%\n")
+        w("\n")
 
     # Analyze deployment scenarios
-    during = scenarios.get("during_deploy", {}).get("Aggregated", {})
+    during = summaries.get("during_deploy")
     if during:
-        report.append(f"**During Deployment:**")
-        report.append(f"- Total requests: {during['request_count']}")
-        report.append(f"- Failed requests: {during['failure_count']} ({100 * during['failure_count'] / max(during['request_count'], 1):.1f}%)")
-        report.append(f"- P99 latency: {during['p99']:.0f}ms")
-        if during['failure_count'] == 0:
-            report.append(f"- ✅ **ZERO-DOWNTIME CONFIRMED** — All requests succeeded during deployment")
+        w("**During Deployment:**\n")
+        w(f"- Total requests: {during.request_count}\n")
+        w(f"- Failed requests: {during.failure_count} ({during.fail_pct:.1f}%)\n")
+        w(f"- P99 latency: {during.p99:.0f}ms\n")
+        if during.failure_count == 0:
+            w("- ✅ **ZERO-DOWNTIME CONFIRMED** — All requests succeeded during deployment\n")
         else:
-            report.append(f"- ⚠️ Some failures detected (likely resource contention on 8GB Mac)")
-        report.append("")
-
-    report.append("## 8GB Mac Resource Contention Note")
-    report.append("")
-    report.append("On an 8GB Mac, the deployment overlap window (both blue and green containers running "
-                 "simultaneously) causes CPU contention that can increase inference latency by 2-10x. "
-                 "This is a hardware limitation, not an architectural flaw. On production hardware with "
-                 "16GB+ RAM and multiple CPU cores, the overlap window would have minimal impact on latency. "
-                 "The zero-downtime architecture is sound — the constraint is the test environment.")
-    report.append("")
-
-    return "\n".join(report)
+            w("- ⚠️ Some failures detected (likely resource contention on 8GB Mac)\n")
+        w("\n")
+
+    w("## 8GB Mac Resource Contention Note\n")
+    w("\n")
+    w("On an 8GB Mac, the deployment overlap window (both blue and green containers running "
+      "simultaneously) causes CPU contention that can increase inference latency by 2-10x. "
+      "This is a hardware limitation, not an architectural flaw. On production hardware with "
+      "16GB+ RAM and multiple CPU cores, the overlap window would have minimal impact on latency. "
+      "The zero-downtime architecture is sound — the constraint is the test environment.\n")
+
+    return buf.getvalue()
 
 
 if __name__ == "__main__":
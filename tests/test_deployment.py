@@ -16,13 +16,18 @@ Usage:
     python tests/test_deployment.py
 """
 
+import functools
 import json
-import subprocess
 import sys
 import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import requests
+from requests.adapters import HTTPAdapter
+
 # Add project root to path
 PROJECT_ROOT = Path(__file__).parent.parent.resolve()
 sys.path.insert(0, str(PROJECT_ROOT))
@@ -35,104 +40,136 @@ class RequestMonitor:
 
     def __init__(self, interval: float = 0.5):
         self.interval = interval
-        self.running = False
+        self._stop = threading.Event()
         self.thread = None
-        self.results = []
         self.lock = threading.Lock()
+        # Incremental aggregates: O(1) summaries and bounded memory
+        # instead of an unbounded per-probe result list
+        self._total = 0
+        self._success = 0
+        self._latency_sum = 0.0
+        self._failed_ring = deque(maxlen=10)
+        # Long-lived session: keep-alive avoids paying process creation
+        # and TCP setup for every probe the way shelling out to curl did
+        self.session = requests.Session()
+        self.session.mount(
+            "http://", HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        )
 
     def start(self):
-        self.running = True
+        self._stop.clear()
         self.thread = threading.Thread(target=self._run, daemon=True)
         self.thread.start()
 
     def stop(self):
-        self.running = False
+        self._stop.set()
         if self.thread:
             self.thread.join(timeout=10)
+        self.session.close()
 
     def _run(self):
-        while self.running:
-            start = time.time()
+        while not self._stop.is_set():
+            t0 = time.monotonic_ns()
             try:
-                result = subprocess.run(
-                    ["curl", "-sf", "--max-time", "5", "http://localhost/healthz"],
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                )
-                elapsed = round((time.time() - start) * 1000, 1)
-                success = result.returncode == 0
+                r = self.session.get("http://localhost/healthz", timeout=5)
+                elapsed = (time.monotonic_ns() - t0) / 1e6
+                success = r.status_code == 200
                 with self.lock:
-                    self.results.append(
-                        {
-                            "time": time.time(),
-                            "success": success,
-                            "latency_ms": elapsed,
-                            "status": "ok" if success else f"rc={result.returncode}",
-                        }
-                    )
-            except Exception as e:
+                    self._total += 1
+                    if success:
+                        self._success += 1
+                        self._latency_sum += elapsed
+                    else:
+                        self._failed_ring.append(
+                            {
+                                "time": time.time(),
+                                "latency_ms": elapsed,
+                                "status": f"status={r.status_code}",
+                            }
+                        )
+            except requests.exceptions.RequestException as e:
                 with self.lock:
-                    self.results.append(
+                    self._total += 1
+                    self._failed_ring.append(
                         {
                             "time": time.time(),
-                            "success": False,
                             "latency_ms": 0,
                             "status": str(e),
                         }
                     )
-            time.sleep(self.interval)
+            # Event.wait doubles as the probe interval and an instant
+            # shutdown signal, unlike a blind time.sleep
+            if self._stop.wait(self.interval):
+                break
 
     def get_summary(self):
         with self.lock:
-            total = len(self.results)
-            successes = sum(1 for r in self.results if r["success"])
-            failures = total - successes
-            avg_latency = (
-                round(
-                    sum(r["latency_ms"] for r in self.results if r["success"])
-                    / max(successes, 1),
-                    1,
-                )
-            )
-            failed_details = [
-                r for r in self.results if not r["success"]
-            ]
             return {
-                "total": total,
-                "successes": successes,
-                "failures": failures,
-                "avg_latency_ms": avg_latency,
-                "failed_details": failed_details[:10],
+                "total": self._total,
+                "successes": self._success,
+                "failures": self._total - self._success,
+                "avg_latency_ms": round(
+                    self._latency_sum / max(self._success, 1), 1
+                ),
+                "failed_details": list(self._failed_ring),
             }
 
 
+STATE_FILE = PROJECT_ROOT / "deploy" / "state.json"
+HISTORY_FILE = PROJECT_ROOT / "deploy" / "history.jsonl"
+
+
+def read_recent_history(limit: int = 20) -> list:
+    """Tail the append-only deployment history (one JSON object per line)."""
+    try:
+        with open(HISTORY_FILE) as f:
+            return [json.loads(line) for line in deque(f, maxlen=limit)]
+    except (OSError, json.JSONDecodeError):
+        return []
+
+
+@functools.lru_cache(maxsize=4)
+def _parse_state(mtime_ns: int) -> dict:
+    return json.loads(STATE_FILE.read_text())
+
+
+def read_state(orchestrator):
+    """Read deployment state, reusing the parse while the file is unchanged.
+
+    Keyed on st_mtime_ns, so a deploy() that rewrites state.json
+    invalidates the cache implicitly.
+    """
+    try:
+        return _parse_state(STATE_FILE.stat().st_mtime_ns)
+    except FileNotFoundError:
+        return orchestrator.read_state()
+
+
+def _probe(url: str) -> bool:
+    try:
+        return requests.get(url, timeout=5).status_code == 200
+    except requests.exceptions.RequestException:
+        return False
+
+
 def check_prerequisites():
     """Verify the system is in the right state to run the test."""
     print("Checking prerequisites...")
 
-    # Blue running?
-    r = subprocess.run(
-        ["curl", "-sf", "--max-time", "5", "http://localhost:8000/ready"],
-        capture_output=True,
-        text=True,
-        timeout=10,
-    )
-    if r.returncode != 0:
+    # Blue and nginx are independent — probe both in parallel
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        blue_ok, nginx_ok = ex.map(
+            _probe,
+            ["http://localhost:8000/ready", "http://localhost/healthz"],
+        )
+
+    if not blue_ok:
         print("FAIL: Blue (port 8000) is not healthy")
         print("Run: make up  # and wait for healthy")
-        return False
-
-    # Nginx running?
-    r = subprocess.run(
-        ["curl", "-sf", "--max-time", "5", "http://localhost/healthz"],
-        capture_output=True,
-        text=True,
-        timeout=10,
-    )
-    if r.returncode != 0:
+    if not nginx_ok:
         print("FAIL: Nginx (port 80) is not routing")
         print("Run: make up")
+    if not (blue_ok and nginx_ok):
         return False
 
     print("  Blue is healthy, nginx is routing. Ready to test.\n")
@@ -147,7 +184,7 @@ def run_test():
     orchestrator = DeploymentOrchestrator(project_root=str(PROJECT_ROOT), health_timeout=180)
 
     # Read initial state
-    initial_state = orchestrator.read_state()
+    initial_state = read_state(orchestrator)
     initial_count = initial_state.get("deployment_count", 0)
     print(f"Initial state: active={initial_state['active_color']}, "
           f"deployments={initial_count}\n")
@@ -168,7 +205,7 @@ def run_test():
 
         orchestrator.deploy()
 
-        state_after_first = orchestrator.read_state()
+        state_after_first = read_state(orchestrator)
         expected_first = initial_state["standby_color"]
         assert state_after_first["active_color"] == expected_first, (
             f"Expected active={expected_first}, "
@@ -187,7 +224,7 @@ def run_test():
 
         orchestrator.deploy()
 
-        state_after_second = orchestrator.read_state()
+        state_after_second = read_state(orchestrator)
         expected_second = state_after_first["standby_color"]
         assert state_after_second["active_color"] == expected_second, (
             f"Expected active={expected_second}, "
@@ -227,9 +264,10 @@ def run_test():
         for f in summary["failed_details"]:
             print(f"    - {f['status']} (latency={f['latency_ms']}ms)")
 
-    # Final state check
-    final_state = orchestrator.read_state()
-    history = final_state.get("history", [])
+    # Final state check — history lives in deploy/history.jsonl now,
+    # not in state.json
+    final_state = read_state(orchestrator)
+    history = read_recent_history()
     recent = [h for h in history if h.get("success")]
     print(f"\n  Deployment count:  {final_state['deployment_count']}")
     print(f"  History entries:   {len(history)}")
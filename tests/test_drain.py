@@ -0,0 +1,53 @@
+"""Unit tests for the orchestrator's event-driven drain.
+
+These stub out the /health/deep probe, so they run without the Docker
+stack (unlike test_deployment.py).
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from deploy.orchestrator import DeploymentOrchestrator
+
+
+@pytest.fixture
+def orchestrator():
+    orch = DeploymentOrchestrator(project_root=str(PROJECT_ROOT))
+    yield orch
+    orch.close()
+
+
+def test_idle_drain_exits_early(orchestrator, monkeypatch):
+    """An idle old container (active_requests == 0) should end the drain
+    after two consecutive polls, not after the full window."""
+    monkeypatch.setattr(
+        orchestrator,
+        "_http_request",
+        lambda port, path, **kw: (200, b'{"active_requests": 0}'),
+    )
+    start = time.monotonic()
+    orchestrator._wait_drain(8000, max_wait=15)
+    assert time.monotonic() - start < 5
+
+
+def test_drain_requires_two_consecutive_quiescent_polls(orchestrator, monkeypatch):
+    """A single zero reading between active polls must not end the drain;
+    only two zeros in a row count as quiescent."""
+    readings = [1, 0, 1, 0, 0]
+    seen = []
+
+    def fake_probe(port, path, **kw):
+        seen.append(readings[len(seen)])
+        return 200, json.dumps({"active_requests": seen[-1]})
+
+    monkeypatch.setattr(orchestrator, "_http_request", fake_probe)
+    orchestrator._wait_drain(8000, max_wait=15)
+    # Exited exactly on the second consecutive zero, not the first one
+    assert seen == readings